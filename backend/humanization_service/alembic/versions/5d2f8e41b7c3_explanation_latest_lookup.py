@@ -0,0 +1,47 @@
+"""Explanation latest lookup
+
+Revision ID: 5d2f8e41b7c3
+Revises: aaabe3f0512b
+Create Date: 2026-10-17 10:12:44.208131
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8e41b7c3'
+down_revision: Union[str, None] = 'aaabe3f0512b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_explanation_versions_scale_version_id',
+        'explanation_versions',
+        ['scale_name', 'version_number', sa.text('id DESC')],
+        unique=False
+    )
+    op.create_table('explanation_current_versions',
+    sa.Column('scale_name', sa.String(), nullable=False),
+    sa.Column('explanation_version_id', sa.Integer(), nullable=False),
+    sa.Column('version_number', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['explanation_version_id'], ['explanation_versions.id'], ),
+    sa.PrimaryKeyConstraint('scale_name')
+    )
+    # Backfill from the newest row of every scale
+    op.execute("""
+        INSERT INTO explanation_current_versions (scale_name, explanation_version_id, version_number)
+        SELECT DISTINCT ON (scale_name) scale_name, id, version_number
+        FROM explanation_versions
+        ORDER BY scale_name, id DESC
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('explanation_current_versions')
+    op.drop_index('ix_explanation_versions_scale_version_id', table_name='explanation_versions')
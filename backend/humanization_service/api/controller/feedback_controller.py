@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter, ValidationError
 from services.feedback_service import FeedbackService
 from database.database_service import DatabaseService
 from dto.feedback_dto import FeedbackDTO
+from core.config import Config
 from typing import List
 
 class FeedbackController:
@@ -13,13 +15,61 @@ class FeedbackController:
         self.router = APIRouter(prefix="/feedback", tags=["Feedback"])
         self.db_service = db_service
         self.feedback_service = FeedbackService(db_service)
+        self.feedback_list_adapter = TypeAdapter(List[FeedbackDTO])
 
         # Register endpoints
         self.router.post("/")(self.submit_feedback)
+        self.router.post("/batch")(self.submit_feedback_batch)
 
     async def submit_feedback(self, feedback: FeedbackDTO):
         """
         Submits feedback for a humanization request.
         """
-        result = await self.feedback_service.create_feedback(feedback.humanization_request_id, feedback.feedback_score)
-        return {"message": "Feedback submitted successfully", "feedback_id": result.id}
+        feedback_id = await self.feedback_service.create_feedback(feedback.humanization_request_id, feedback.feedback_score)
+        return {"message": "Feedback submitted successfully", "feedback_id": feedback_id}
+
+    async def submit_feedback_batch(self, request: Request):
+        """
+        Submits many feedback entries at once, either as a JSON array or as an NDJSON stream
+        (Content-Type: application/x-ndjson). NDJSON bodies are loaded in batches while they are
+        still being received, so memory stays bounded by the batch size.
+        """
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            inserted = await self._ingest_ndjson(request)
+        else:
+            try:
+                feedbacks = self.feedback_list_adapter.validate_json(await request.body())
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+            inserted = 0
+            for start in range(0, len(feedbacks), Config.FEEDBACK_COPY_BATCH_SIZE):
+                inserted += await self.feedback_service.create_feedback_batch(feedbacks[start:start + Config.FEEDBACK_COPY_BATCH_SIZE])
+        return {"message": "Feedback batch submitted successfully", "inserted": inserted}
+
+    async def _ingest_ndjson(self, request: Request) -> int:
+        inserted = 0
+        line_number = 0
+        batch = []
+        pending = b""
+        async for body_chunk in request.stream():
+            pending += body_chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    batch.append(FeedbackDTO.model_validate_json(line))
+                except ValidationError as e:
+                    raise HTTPException(status_code=422, detail={"line": line_number, "inserted": inserted, "errors": e.errors(include_url=False)})
+                if len(batch) >= Config.FEEDBACK_COPY_BATCH_SIZE:
+                    inserted += await self.feedback_service.create_feedback_batch(batch)
+                    batch = []
+        if pending.strip():
+            line_number += 1
+            try:
+                batch.append(FeedbackDTO.model_validate_json(pending))
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail={"line": line_number, "inserted": inserted, "errors": e.errors(include_url=False)})
+        inserted += await self.feedback_service.create_feedback_batch(batch)
+        return inserted
@@ -1,4 +1,8 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+import anyio
+from contextlib import aclosing
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from services.humanization_service import HumanizationService
 from message_queue.message_queue_service import MessageQueueService
 from database.database_service import DatabaseService
@@ -6,24 +10,89 @@ from dto.humanize_dto import HumanizationRequestDTO
 from cache.cache_service import CacheService
 from message_queue.messages.humanization_task import HumanizationTask
 import asyncio
-import json
 from core.config import Config
 from message_queue.messages.humanized_queue_message import HumanizedQueueMessage
+from message_queue.result_stream_router import ResultStreamRouter
+from message_queue.control_channel import RequestControlChannel
+from message_queue.token_coalescer import TokenCoalescer
+from message_queue.wire_format import encode_task, decode_result, WireFormatError, CONTENT_TYPE_RESULT_FRAME_V1, RESULT_TYPE_FINAL
+from core.serialization import dumps_str, loads
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from database.repository.humanization import HumanizationRepository
+from services.request_id_allocator import RequestIdAllocator
+from services.request_writer import HumanizationRequestWriter
+from services.tenant_quota import TenantQuota, TenantQuotaExceededError
+
+class RequestInProgressError(Exception):
+    """
+    Raised for a retry whose idempotency key belongs to a request that has not finished yet.
+    """
+    def __init__(self, request_id: int):
+        super().__init__(f"Request {request_id} with this idempotency key is still in progress")
+        self.request_id = request_id
+
+class _ClientNotReadingError(Exception):
+    """
+    Raised on a multiplexed socket whose client lets replies pile up without reading them.
+    """
+
+class _GuardedStreamingResponse(StreamingResponse):
+    """
+    A streaming response that calls on_abandoned if its body never started, e.g. because the
+    client disconnected first, so nothing claimed for the stream is left behind.
+    """
+    def __init__(self, content, on_abandoned, **kwargs):
+        self.started = False
+        self.on_abandoned = on_abandoned
+
+        async def body():
+            self.started = True
+            async for chunk in content:
+                yield chunk
+
+        super().__init__(body(), **kwargs)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if not self.started:
+                with anyio.CancelScope(shield=True):
+                    await self.on_abandoned()
 
 class HumanizationController:
     """
-    Controller for handling humanization requests using WebSocket streaming.
+    Controller for handling humanization requests using WebSocket streaming, plain HTTP
+    and HTTP streaming. Every transport runs requests through the same task pipeline.
+
+    Request ids are allocated server-side. By default a socket carries a single request and
+    is then closed. Connecting with ?multiplex=1 keeps the socket open for many concurrent
+    requests whose messages are tagged with the client's tag. The first and final message of
+    every stream carry the allocated request_id, which feedback refers to.
+
+    Tasks are queued on the interactive lane, except HTTP batches which go to the batch lane,
+    and count against the tenant's quota for that lane.
     """
 
-    def __init__(self, db_service: DatabaseService, cache_service: CacheService, messaging_service: MessageQueueService):
+    def __init__(self, db_service: DatabaseService, cache_service: CacheService, messaging_service: MessageQueueService, result_router: ResultStreamRouter):
         self.router = APIRouter(prefix="/humanize", tags=["Humanization"])
         self.db_service = db_service
         self.cache_service = cache_service
         self.messaging_service = messaging_service
+        self.result_router = result_router
+        self.control_channel = RequestControlChannel(messaging_service)
         self.humanization_service = HumanizationService(db_service, cache_service, messaging_service)
+        self.humanization_repository = HumanizationRepository(db_service)
+        self.request_ids = RequestIdAllocator(self.humanization_repository)
+        self.request_writer = HumanizationRequestWriter(self.humanization_repository)
+        self.tenant_quota = TenantQuota(cache_service)
+        self.websocket_coalescer = TokenCoalescer(max_bytes=Config.WEBSOCKET_COALESCE_MAX_BYTES, window_ms=Config.WEBSOCKET_COALESCE_WINDOW_MS)
 
-        # Register WebSocket endpoint
+        # Register WebSocket and HTTP endpoints
         self.router.websocket("/ws")(self.websocket_humanization)
+        self.router.post("")(self.humanize)
+        self.router.post("/stream")(self.humanize_stream)
+        self.router.post("/batch")(self.humanize_batch)
 
     async def websocket_humanization(self, websocket: WebSocket):
         """
@@ -31,45 +100,484 @@ class HumanizationController:
         """
         await websocket.accept()
         connection_id = str(websocket.client)  # Simple identifier for tracking
+        # Browsers cannot set headers on a WebSocket, so the key may also come as ?api_key=
+        api_key = websocket.headers.get(Config.TENANT_API_KEY_HEADER) or websocket.query_params.get("api_key")
+
+        if websocket.query_params.get("multiplex") in ("1", "true"):
+            await self.multiplexed_session(websocket, connection_id, api_key)
+            return
 
         try:
+            # Receive input text and parameters from the client
+            data = await websocket.receive_text()
+            request = HumanizationRequestDTO.model_validate_json(data)
+            print(f"Received request: {request}", flush=True)
+            try:
+                await self.tenant_quota.acquire(api_key, Config.INTERACTIVE_TASK_QUEUE)
+                request_id, completed_text = await self.begin_request(request, api_key)
+            except TenantQuotaExceededError as e:
+                await websocket.send_text(dumps_str({"request_id": None, "error": str(e), "retry_after": e.retry_after}))
+                await websocket.close()
+                return
+            except RequestInProgressError as e:
+                await websocket.send_text(dumps_str({"request_id": e.request_id, "error": str(e)}))
+                await websocket.close()
+                return
+            # Closing the results on disconnect cancels the task on the worker
+            async with aclosing(self.stream_results(request, request_id, completed_text, api_key=api_key)) as results:
+                async for text in results:
+                    await websocket.send_text(text)  # Stream chunks to the client
+            await websocket.close()
+
+        except WebSocketDisconnect:
+            print(f"WebSocket disconnected: {connection_id}")
+
+    async def multiplexed_session(self, websocket: WebSocket, connection_id: str, api_key: Optional[str] = None):
+        """
+        Serves many concurrent requests over one socket. Each client message is either a request
+        or {"type": "cancel", "tag": ...}. Requests must carry a tag unique on the socket, and every
+        message sent back carries it.
+
+        At most WEBSOCKET_MAX_CONCURRENT_REQUESTS run at once and up to WEBSOCKET_MAX_PENDING_REQUESTS
+        more wait for a slot; requests beyond that are refused. The socket is always read, so cancels
+        get through at capacity. Outgoing messages go through a bounded queue drained by a single
+        writer, so a slow client slows its own streams down; results it cannot keep up with fail the
+        request rather than piling up in memory. The session ends if the writer fails.
+        """
+        outbound = asyncio.Queue(maxsize=Config.WEBSOCKET_SEND_QUEUE_SIZE)
+        slots = asyncio.Semaphore(Config.WEBSOCKET_MAX_CONCURRENT_REQUESTS)
+        max_accepted = Config.WEBSOCKET_MAX_CONCURRENT_REQUESTS + Config.WEBSOCKET_MAX_PENDING_REQUESTS
+        in_flight: Dict[int, asyncio.Task] = {}
+
+        async def write():
             while True:
-                # Receive input text and parameters from the client
-                data = await websocket.receive_text()
-                request = HumanizationRequestDTO.parse_raw(data)
-                print(f"Received request: {request}", flush=True)
-                # Build the task
-                task = HumanizationTask.build(
-                    request_id=request.request_id,
-                    original_text=request.original_text,
-                    model_name=request.model_name,
-                    parameters=request.parameters,
-                    parameter_explanation_versions=request.parameter_explanation_versions,
-                    queue_name="humanization_task"
-                )
-
-                # Publish task to RabbitMQ
-                task_id = await self.messaging_service.send_message(queue_name="humanization_task", message=json.dumps(task.dict()))
+                await websocket.send_text(await outbound.get())
 
-                # Subscribe to the response queue
-                queue_name = f"humanization_result_{request.request_id}"
-                print(f"[HumanizationController] Subscribing to queue: {queue_name}", flush=True)
-                isLast = False
-                async for chunk in self.messaging_service.get_next_message(queue_name=queue_name):
-                    parsed_chumk = json.loads(chunk)
-                    print(f"[HumanizationController] Received chunk: {parsed_chumk}", flush=True)
-                    message = HumanizedQueueMessage(isLast=parsed_chumk["isLast"], text_piece=parsed_chumk["text_piece"], final_text=parsed_chumk["final_text"])
-                    isLast = message.isLast
-                    await websocket.send_text(json.dumps(message.to_dict()))  # Stream chunks to the client
-                    if isLast:
-                        break
-
-                print(f"[HumanizationController] Deleting queue: {queue_name}", flush=True)
-                await self.messaging_service.delete_queue(queue_name=queue_name)
-                print(f"[HumanizationController] Deleted queue: {queue_name}", flush=True)
+        def reply(payload: dict):
+            # The reader never waits on the client, or it could not read cancels while the socket is full
+            try:
+                outbound.put_nowait(dumps_str(payload))
+            except asyncio.QueueFull:
+                raise _ClientNotReadingError("Client is not reading its messages")
 
-                await websocket.close()
-                break
+        async def run(request: HumanizationRequestDTO):
+            try:
+                async with slots:
+                    await self.tenant_quota.acquire(api_key, Config.INTERACTIVE_TASK_QUEUE)
+                    request_id, completed_text = await self.begin_request(request, api_key)
+                    async with aclosing(self.stream_results(request, request_id, completed_text, tag=request.tag, api_key=api_key)) as results:
+                        async for text in results:
+                            await outbound.put(text)
+            except asyncio.CancelledError:
+                raise
+            except TenantQuotaExceededError as e:
+                await outbound.put(dumps_str({"tag": request.tag, "error": str(e), "retry_after": e.retry_after}))
+            except Exception as e:
+                print(f"[HumanizationController] Request {request.tag} on {connection_id} failed: {e}", flush=True)
+                await outbound.put(dumps_str({"tag": request.tag, "error": str(e)}))
+            finally:
+                in_flight.pop(request.tag, None)
+
+        writer = asyncio.create_task(write())
+        try:
+            while True:
+                receive = asyncio.create_task(websocket.receive_text())
+                await asyncio.wait({receive, writer}, return_when=asyncio.FIRST_COMPLETED)
+                if writer.done():
+                    receive.cancel()
+                    print(f"[HumanizationController] Sending to {connection_id} failed: {writer.exception()}", flush=True)
+                    break
+                data = receive.result()
+
+                try:
+                    message = loads(data)
+                except ValueError:
+                    reply({"tag": None, "error": "Message is not valid JSON"})
+                    continue
+
+                if message.get("type") == "cancel":
+                    task = in_flight.get(message.get("tag"))
+                    if task is not None:
+                        task.cancel()
+                        reply({"tag": message["tag"], "cancelled": True})
+                    continue
+
+                try:
+                    request = HumanizationRequestDTO.model_validate(message)
+                except ValidationError as e:
+                    reply({"tag": message.get("tag"), "error": str(e)})
+                    continue
+                if request.tag is None:
+                    reply({"tag": None, "error": "Multiplexed requests need a tag"})
+                    continue
+                if request.tag in in_flight:
+                    reply({"tag": request.tag, "error": "Request is already in progress"})
+                    continue
+                if len(in_flight) >= max_accepted:
+                    reply({"tag": request.tag, "error": "Too many requests in progress on this socket"})
+                    continue
+
+                in_flight[request.tag] = asyncio.create_task(run(request))
 
         except WebSocketDisconnect:
             print(f"WebSocket disconnected: {connection_id}")
+        except _ClientNotReadingError as e:
+            print(f"[HumanizationController] Closing {connection_id}: {e}", flush=True)
+            writer.cancel()
+            # Policy violation, so the client learns why rather than seeing the connection drop
+            await websocket.close(code=1008, reason=str(e))
+        finally:
+            tasks = list(in_flight.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.cancel()
+
+    async def humanize(self, humanization_request: HumanizationRequestDTO, request: Request):
+        """
+        Humanizes a text and responds once the full result is available.
+        """
+        await self.charge_quota(request, Config.INTERACTIVE_TASK_QUEUE)
+        try:
+            request_id, final_message = await asyncio.wait_for(self.humanize_text(humanization_request, api_key=request.headers.get(Config.TENANT_API_KEY_HEADER)), timeout=Config.HTTP_REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Timed out waiting for the humanized text")
+        except RequestInProgressError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return {"request_id": request_id, "humanized_text": final_message.final_text}
+
+    async def humanize_stream(self, humanization_request: HumanizationRequestDTO, request: Request):
+        """
+        Streams the result messages of a humanization as Server-Sent Events when the client
+        accepts text/event-stream, and as newline-delimited JSON otherwise.
+        The allocated request id is returned in the X-Request-Id header.
+        """
+        quota_counter = await self.charge_quota(request, Config.INTERACTIVE_TASK_QUEUE)
+        api_key = request.headers.get(Config.TENANT_API_KEY_HEADER)
+        try:
+            request_id, completed_text = await self.begin_request(humanization_request, api_key)
+        except RequestInProgressError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        results = self.stream_results(humanization_request, request_id, completed_text, api_key=api_key)
+        headers = {"X-Request-Id": str(request_id)}
+
+        async def abandoned():
+            # The body never ran, so the task was never published
+            await self.release_idempotency_key(humanization_request, api_key)
+            await self.tenant_quota.release(quota_counter)
+
+        # The results are closed when the client disconnects, which cancels the task on the worker
+        if "text/event-stream" in request.headers.get("accept", ""):
+            async def events():
+                async with aclosing(results):
+                    async for text in results:
+                        yield f"data: {text}\n\n"
+            return _GuardedStreamingResponse(events(), abandoned, media_type="text/event-stream", headers={**headers, "Cache-Control": "no-cache"})
+
+        async def lines():
+            async with aclosing(results):
+                async for text in results:
+                    yield text + "\n"
+        return _GuardedStreamingResponse(lines(), abandoned, media_type="application/x-ndjson", headers=headers)
+
+    async def humanize_batch(self, humanization_requests: List[HumanizationRequestDTO], request: Request):
+        """
+        Humanizes many texts in one call on the batch lane. Results are streamed back as
+        newline-delimited JSON in completion order, one line per request identified by its
+        index in the batch, with at most HTTP_BATCH_CONCURRENCY in flight.
+        The whole batch counts against the tenant's batch quota up front.
+        """
+        if len(humanization_requests) > Config.HTTP_BATCH_MAX_SIZE:
+            raise HTTPException(status_code=413, detail=f"A batch holds at most {Config.HTTP_BATCH_MAX_SIZE} requests")
+        quota_counter = await self.charge_quota(request, Config.BATCH_TASK_QUEUE, count=len(humanization_requests))
+        api_key = request.headers.get(Config.TENANT_API_KEY_HEADER)
+
+        async def results():
+            slots = asyncio.Semaphore(Config.HTTP_BATCH_CONCURRENCY)
+
+            async def run(index: int, humanization_request: HumanizationRequestDTO) -> dict:
+                async with slots:
+                    try:
+                        request_id, final_message = await asyncio.wait_for(self.humanize_text(humanization_request, lane=Config.BATCH_TASK_QUEUE, api_key=api_key), timeout=Config.HTTP_REQUEST_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        return {"index": index, "error": "Timed out waiting for the humanized text"}
+                    except Exception as e:
+                        return {"index": index, "error": str(e)}
+                return {"index": index, "request_id": request_id, "humanized_text": final_message.final_text}
+
+            tasks = [asyncio.create_task(run(index, humanization_request)) for index, humanization_request in enumerate(humanization_requests)]
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    yield dumps_str(await completed) + "\n"
+            finally:
+                # The client went away; stop the remaining requests
+                for task in tasks:
+                    task.cancel()
+
+        async def abandoned():
+            # The body never ran, so none of the batch's tasks were published
+            await self.tenant_quota.release(quota_counter, len(humanization_requests))
+
+        return _GuardedStreamingResponse(results(), abandoned, media_type="application/x-ndjson")
+
+    async def charge_quota(self, request: Request, lane: str, count: int = 1) -> Optional[str]:
+        """
+        Counts tasks against the quota of the tenant whose API key the request carries,
+        responding 429 with Retry-After when they do not fit. Returns the quota counter charged.
+        """
+        try:
+            return await self.tenant_quota.acquire(request.headers.get(Config.TENANT_API_KEY_HEADER), lane, count)
+        except TenantQuotaExceededError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    @staticmethod
+    def idempotency_cache_key(request: HumanizationRequestDTO, api_key: Optional[str]) -> str:
+        """
+        Idempotency keys are scoped to the tenant, so tenants choosing the same key never share requests.
+        """
+        return f"humanization_idempotency_{TenantQuota.tenant_id(api_key)}_{request.idempotency_key}"
+
+    async def begin_request(self, request: HumanizationRequestDTO, api_key: Optional[str] = None) -> Tuple[int, Optional[str]]:
+        """
+        Allocates the id of a new request and queues its row insert without waiting for it.
+
+        With an idempotency key, a retry by the same tenant is matched to the original request instead:
+        its id and stored text are returned if it finished, RequestInProgressError is raised while it
+        runs, and no new task is published either way. Returns (request_id, completed_text).
+        """
+        request_id = await self.request_ids.allocate()
+        if request.idempotency_key:
+            claimed, original_request_id = await self.cache_service.set_if_absent(
+                self.idempotency_cache_key(request, api_key), request_id, ttl=Config.IDEMPOTENCY_KEY_TTL
+            )
+            if not claimed:
+                original = await self.humanization_repository.get_request(original_request_id)
+                if original is not None and original.humanized_text is not None:
+                    return original_request_id, original.humanized_text
+                raise RequestInProgressError(original_request_id)
+
+        self.request_writer.submit(
+            request_id=request_id,
+            original_text=request.original_text,
+            parameters=request.parameters,
+            explanation_versions=request.parameter_explanation_versions or {},  # Resolved versions are stored with the result
+            model_name=request.model_name
+        )
+        return request_id, None
+
+    async def release_idempotency_key(self, request: HumanizationRequestDTO, api_key: Optional[str] = None):
+        """
+        Lets a retry run again after the request could not be started.
+        """
+        if request.idempotency_key:
+            # Shielded: this runs while the request is being cancelled
+            with anyio.CancelScope(shield=True):
+                await self.cache_service.delete(self.idempotency_cache_key(request, api_key))
+
+    async def humanize_text(self, request: HumanizationRequestDTO, lane: str = Config.INTERACTIVE_TASK_QUEUE, api_key: Optional[str] = None) -> Tuple[int, HumanizedQueueMessage]:
+        """
+        Runs a request through the pipeline on a lane and returns its id and final message, which holds the full text.
+        """
+        request_id, completed_text = await self.begin_request(request, api_key)
+        if completed_text is not None:
+            return request_id, HumanizedQueueMessage.final(completed_text)
+        try:
+            async with aclosing(self.result_chunks(request, request_id, accept=self.result_content_type(pass_through=False), lane=lane)) as chunks:
+                async for message in self.decode_results(chunks, request_id):
+                    if message.isLast:
+                        return request_id, message
+        except BaseException:
+            # Failed or abandoned; the task was cancelled, so a retry has to run again
+            await self.release_idempotency_key(request, api_key)
+            raise
+        raise RuntimeError(f"Result stream of request {request_id} ended without a final message")
+
+    async def stream_results(self, request: HumanizationRequestDTO, request_id: int, completed_text: str = None, tag: int = None, api_key: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Runs a request begun with begin_request through the pipeline and yields the client-facing
+        JSON messages of its result, ending with the final message. An idempotent retry of a finished
+        request replays its stored text instead. The first and final message carry the request_id,
+        and with a tag every message also carries it.
+        """
+        if completed_text is not None:
+            yield self.render_message(HumanizedQueueMessage(isLast=False, text_piece=completed_text), request_id, tag)
+            yield self.render_message(HumanizedQueueMessage.final(completed_text), request_id, tag)
+            return
+
+        accept = self.result_content_type(pass_through=Config.WEBSOCKET_PASS_THROUGH)
+        try:
+            async with aclosing(self.result_chunks(request, request_id, accept)) as chunks:
+                if Config.WEBSOCKET_PASS_THROUGH:
+                    results = self.forward_results(chunks, request_id, tag)
+                else:
+                    results = self.relay_results(chunks, request_id, tag)
+                # Closed before the chunks, which its coalescer may still be reading
+                async with aclosing(results):
+                    async for text in results:
+                        yield text
+        except BaseException:
+            # Failed or abandoned; the task was cancelled, so a retry has to run again
+            await self.release_idempotency_key(request, api_key)
+            raise
+
+    @staticmethod
+    def result_content_type(pass_through: bool):
+        """
+        The result encoding to request from workers. Pass-through forwards results as they are,
+        so they must arrive as client-ready JSON.
+        """
+        if Config.RESULT_WIRE_FORMAT == "frame" and not pass_through:
+            return CONTENT_TYPE_RESULT_FRAME_V1
+        return None
+
+    async def result_chunks(self, request: HumanizationRequestDTO, request_id: int, accept: str = None, lane: str = Config.INTERACTIVE_TASK_QUEUE):
+        """
+        Publishes the task for a request on a lane's queue and yields the raw result messages the worker sends back.
+        Stops being routed results, or deletes the legacy result queue, once closed. Closing before the final
+        message arrived means the request was abandoned, so the worker running it is told to cancel it.
+        """
+        use_exchange = Config.RESULT_TRANSPORT == "exchange"
+        if use_exchange:
+            await self.result_router.start()
+            # Subscribe before publishing so no chunk can arrive unrouted
+            subscriber = self.result_router.subscribe(request_id)
+
+        # Build the task
+        task = HumanizationTask.build(
+            request_id=request_id,
+            original_text=request.original_text,
+            model_name=request.model_name,
+            parameters=request.parameters,
+            parameter_explanation_versions=request.parameter_explanation_versions or {},
+            queue_name=lane,
+            reply_to=self.result_router.reply_to if use_exchange else None,
+            use_result_cache=request.use_result_cache,
+            accept=accept
+        )
+        queue_name = f"humanization_result_{request_id}"
+        published = finished = False
+
+        try:
+            # Publish task to RabbitMQ
+            body, content_type = encode_task(task, Config.TASK_WIRE_FORMAT)
+            await self.messaging_service.send_message(queue_name=lane, message=body, content_type=content_type)
+            published = True
+
+            if use_exchange:
+                print(f"[HumanizationController] Streaming request {request_id} via {self.result_router.reply_to}", flush=True)
+                chunks = self.result_router.iterate(subscriber)
+            else:
+                # Subscribe to the response queue
+                print(f"[HumanizationController] Subscribing to queue: {queue_name}", flush=True)
+                chunks = self.messaging_service.get_next_message(queue_name=queue_name)
+
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    finished = chunk.type == RESULT_TYPE_FINAL
+                    yield chunk
+        finally:
+            # Shielded so the cleanup completes when a disconnected client's response body is
+            # cancelled through an anyio cancel scope, which would cancel every await here again
+            with anyio.CancelScope(shield=True):
+                if published and not finished:
+                    await self.cancel_task(request_id)
+                if use_exchange:
+                    self.result_router.unsubscribe(request_id)
+                else:
+                    print(f"[HumanizationController] Deleting queue: {queue_name}", flush=True)
+                    await self.messaging_service.delete_queue(queue_name=queue_name)
+                    print(f"[HumanizationController] Deleted queue: {queue_name}", flush=True)
+
+    async def cancel_task(self, request_id: int):
+        """
+        Asks the worker running a request to abort it, so an abandoned request stops using
+        upstream tokens and a worker slot.
+        """
+        print(f"[HumanizationController] Cancelling abandoned request {request_id}", flush=True)
+        try:
+            await self.control_channel.publish_cancel(request_id)
+        except Exception as e:
+            print(f"[HumanizationController] Failed to cancel request {request_id}: {e}", flush=True)
+
+    async def forward_results(self, chunks, request_id: int, tag: int = None) -> AsyncIterator[str]:
+        """
+        Yields worker result messages verbatim, without decoding and re-encoding them.
+        The request_id and tag are spliced into the JSON object rather than re-encoding it.
+        """
+        first = True
+        async for chunk in chunks:
+            if chunk.type is None:
+                # Older workers do not mark the final message
+                is_last = decode_result(chunk.body, chunk.content_type).isLast
+            else:
+                is_last = chunk.type == RESULT_TYPE_FINAL
+            fields = self.client_fields(request_id if first or is_last else None, tag)
+            text = chunk.body.decode()
+            if fields:
+                text = f"{dumps_str(fields)[:-1]},{text[1:]}"
+            yield text
+            first = False
+            if is_last:
+                return
+
+    async def decode_results(self, chunks, request_id: int) -> AsyncIterator[HumanizedQueueMessage]:
+        """
+        Decodes worker result messages in any wire format, up to and including the final message,
+        whose text is rebuilt from the pieces when the worker did not repeat it. A rebuilt text that
+        fails its length/checksum check raises WireFormatError instead of being returned.
+        """
+        received_pieces = []
+        async for chunk in chunks:
+            message = decode_result(chunk.body, chunk.content_type)
+            if message.isLast:
+                if message.length is not None:
+                    # Framed results do not repeat the text; rebuild it from the pieces
+                    message.final_text = "".join(received_pieces)
+                    if not message.verify(message.final_text):
+                        print(f"[HumanizationController] Reassembled text of request {request_id} failed its length/checksum check", flush=True)
+                        raise WireFormatError(f"Result of request {request_id} arrived incomplete or corrupted")
+                yield message
+                return
+            received_pieces.append(message.text_piece)
+            yield message
+
+    async def relay_results(self, chunks, request_id: int, tag: int = None) -> AsyncIterator[str]:
+        """
+        Decodes worker result messages, coalesces the text pieces and yields them as client-facing JSON.
+        """
+        final_message = None
+
+        async def text_pieces():
+            nonlocal final_message
+            async for message in self.decode_results(chunks, request_id):
+                if message.isLast:
+                    final_message = message
+                    return
+                yield message.text_piece
+
+        first = True
+        async with aclosing(self.websocket_coalescer.coalesce(text_pieces())) as coalesced:
+            async for text_piece in coalesced:
+                yield self.render_message(HumanizedQueueMessage(isLast=False, text_piece=text_piece), request_id if first else None, tag)
+                first = False
+        if final_message is not None:
+            yield self.render_message(final_message, request_id, tag)
+
+    @staticmethod
+    def client_fields(request_id: int = None, tag: int = None) -> dict:
+        """
+        The identifying fields put in front of a client-facing message, leaving out those not given.
+        """
+        fields = {}
+        if tag is not None:
+            fields["tag"] = tag
+        if request_id is not None:
+            fields["request_id"] = request_id
+        return fields
+
+    @staticmethod
+    def render_message(message: HumanizedQueueMessage, request_id: int = None, tag: int = None) -> str:
+        """
+        Encodes a result message for the client, with its request_id and tag when given.
+        """
+        return dumps_str({**HumanizationController.client_fields(request_id, tag), **message.to_dict()})
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from services.explanation_service import ExplanationService
 from database.database_service import DatabaseService
 from dto.explanation_dto import ExplanationDTO
+from cache.cache_service import CacheService
 from typing import List
 
 class ManagementController:
@@ -9,13 +10,15 @@ class ManagementController:
     Handles management of explanation versions and scale settings.
     """
 
-    def __init__(self, db_service: DatabaseService):
+    def __init__(self, db_service: DatabaseService, cache_service: CacheService):
         self.router = APIRouter(prefix="/management", tags=["Management"])
         self.db_service = db_service
-        self.explanation_service = ExplanationService(db_service)
+        self.cache_service = cache_service
+        self.explanation_service = ExplanationService(db_service, cache_service)
 
         # Register endpoints
         self.router.post("/explanations")(self.create_explanation_version)
+        self.router.get("/metrics")(self.get_metrics)
 
     async def create_explanation_version(self, explanation: ExplanationDTO):
         """
@@ -28,3 +31,14 @@ class ManagementController:
             examples=explanation.examples
         )
         return {"message": "Explanation version created", "version_id": result.id}
+
+    async def get_metrics(self):
+        """
+        Returns the latest metrics snapshot published by each live worker, plus this API
+        instance's database pool utilization.
+        """
+        snapshots = await self.cache_service.get_by_prefix("worker_metrics_")
+        return {
+            "api": {"database_pool": self.db_service.pool_stats()},
+            "workers": [snapshot for snapshot in snapshots.values() if snapshot is not None],
+        }
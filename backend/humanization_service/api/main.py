@@ -1,8 +1,29 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import register_routes
+from core.config import Config
+from api.routes import register_routes, messaging_service, result_router, cache_service, db_service, feedback_controller, humanization_controller
 
-app = FastAPI(title="Humanization API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Keeps the shared RabbitMQ connection healthy while the API runs, declares this process's
+    reply queue once, and closes the long-lived connections on shutdown.
+    """
+    health_check_task = asyncio.create_task(messaging_service.run_health_checks())
+    if Config.RESULT_TRANSPORT == "exchange":
+        await result_router.start()
+    yield
+    health_check_task.cancel()
+    await feedback_controller.feedback_service.close()
+    await humanization_controller.request_writer.close()
+    await result_router.close()
+    await messaging_service.close()
+    await cache_service.disconnect()
+    await db_service.close()
+
+app = FastAPI(title="Humanization API", version="1.0.0", lifespan=lifespan)
 
 # CORS Middleware (if needed for frontend integration)
 app.add_middleware(
@@ -5,6 +5,7 @@ from api.controller.management_controller import ManagementController
 from database.database_service import DatabaseService
 from message_queue.message_queue_service import MessageQueueService
 from cache.cache_service import CacheService
+from message_queue.result_stream_router import ResultStreamRouter
 
 # Initialize FastAPI app
 app = FastAPI(title="Humanization API", version="1.0.0")
@@ -13,11 +14,12 @@ app = FastAPI(title="Humanization API", version="1.0.0")
 db_service = DatabaseService()
 messaging_service = MessageQueueService()
 cache_service = CacheService()
+result_router = ResultStreamRouter(messaging_service)
 
 # Instantiate controllers with shared services
-humanization_controller = HumanizationController(db_service=db_service, cache_service=cache_service, messaging_service=messaging_service)
+humanization_controller = HumanizationController(db_service=db_service, cache_service=cache_service, messaging_service=messaging_service, result_router=result_router)
 feedback_controller = FeedbackController(db_service=db_service)
-management_controller = ManagementController(db_service=db_service)
+management_controller = ManagementController(db_service=db_service, cache_service=cache_service)
 def register_routes(app: FastAPI):
     # Register routes from controllers
     app.include_router(humanization_controller.router)
@@ -1,74 +1,562 @@
 import aioredis
-import json
+import asyncio
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from uuid import uuid4
 from core.config import Config
+from cache.local_cache import LocalCache
+from core.serialization import dumps_str, loads
+
+# Deletes a lock only if it is still held with our token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Stores a value only if the generation counter still holds the value read before loading it
+_STORE_IF_GENERATION_SCRIPT = """
+if (redis.call("get", KEYS[2]) or "") ~= ARGV[3] then
+    return 0
+end
+if tonumber(ARGV[2]) > 0 then
+    redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[2])
+else
+    redis.call("set", KEYS[1], ARGV[1])
+end
+return 1
+"""
 
 class CacheService:
     """
     A utility class to handle Redis interactions asynchronously.
+
+    Holds one long-lived pooled client for the lifetime of the process. Reads and writes
+    made with local=True also go through an in-process LRU/TTL cache in front of Redis.
     """
     def __init__(self):
         self.host = Config.REDIS_HOST
         self.port = Config.REDIS_PORT
         self.db = Config.REDIS_DB
         self.ttl = Config.REDIS_TTL  # Default TTL of 1 hour
+        self.max_connections = Config.REDIS_MAX_CONNECTIONS
         self.client = None
+        self.local_cache = LocalCache(max_entries=Config.LOCAL_CACHE_MAX_ENTRIES, ttl=Config.LOCAL_CACHE_TTL)
+        self._connect_lock = asyncio.Lock()
+        self.lock_timeout_ms = Config.CACHE_LOCK_TIMEOUT_MS
+        self.lock_poll_interval = Config.CACHE_LOCK_POLL_INTERVAL_MS / 1000
+        self.stale_ttl = Config.CACHE_STALE_TTL
+        self.xfetch_beta = Config.CACHE_XFETCH_BETA
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._refreshing = set()  # Keys in _loading that are background refreshes
+        self._refresh_tasks = set()
 
 
     async def connect(self):
         """
-        Establishes an asynchronous connection to Redis.
+        Establishes the pooled asynchronous connection to Redis, once.
         """
-        url = f"redis://{self.host}:{self.port}/{self.db}"
-        print("Connecting to Redis at", url, flush=True)
-        self.client = await aioredis.from_url(url, decode_responses=True)
+        async with self._connect_lock:
+            if self.client is not None:
+                return
+            url = f"redis://{self.host}:{self.port}/{self.db}"
+            print("Connecting to Redis at", url, flush=True)
+            self.client = await aioredis.from_url(url, decode_responses=True, max_connections=self.max_connections)
 
     async def disconnect(self):
         """
-        Closes the Redis connection.
+        Closes the Redis connection pool.
         """
         if self.client:
             await self.client.close()
-            self.client = None  
-    
+            await self.client.connection_pool.disconnect()
+            self.client = None
 
-    async def set(self, key: str, value: dict, ttl: int = None):
+
+    async def set(self, key: str, value: dict, ttl: int = None, local: bool = False):
         """
         Stores a key-value pair in Redis with an optional TTL.
         """
+        if local:
+            self.local_cache.set(key, value)
         if self.client is None:
             await self.connect()
         try:
             ttl = ttl if ttl is not None else self.ttl
-            await self.client.setex(key, ttl, json.dumps(value))
+            # A TTL of 0 stores the key without expiry
+            await self.client.set(key, dumps_str(value), ex=int(ttl) or None)
         except Exception as e:
             print(f"Redis set error: {e}")
-    
 
-    async def get(self, key: str):
+
+    async def get(self, key: str, local: bool = False):
         """
-        Retrieves a value from Redis by key.
+        Retrieves a value by key, from the in-process cache first when local is set, then from Redis.
         """
+        if local:
+            value = self.local_cache.get(key)
+            if value is not None:
+                return value
         if self.client is None:
             await self.connect()
         try:
             value = await self.client.get(key)
-            return json.loads(value) if value else None
+            value = loads(value) if value else None
+            if local and value is not None:
+                self.local_cache.set(key, value)
+            return value
         except Exception as e:
             print(f"Redis get error: {e}")
             return None
-    
 
-    async def delete(self, key: str):
+
+    async def get_many(self, keys: List[str], local: bool = False) -> Dict[str, Any]:
         """
-        Deletes a key from Redis.
+        Retrieves several values at once: from the in-process cache first when local is set,
+        then the rest with a single MGET. Missing keys map to None.
         """
+        values = {}
+        remaining = []
+        for key in keys:
+            value = self.local_cache.get(key) if local else None
+            if value is not None:
+                values[key] = value
+            else:
+                remaining.append(key)
+        if not remaining:
+            return values
+
         if self.client is None:
             await self.connect()
         try:
-            await self.client.delete(key)
+            for key, value in zip(remaining, await self.client.mget(remaining)):
+                value = loads(value) if value else None
+                if local and value is not None:
+                    self.local_cache.set(key, value)
+                values[key] = value
+        except Exception as e:
+            print(f"Redis mget error: {e}")
+            for key in remaining:
+                values[key] = None
+        return values
+
+
+    async def set_many(self, items: Dict[str, Any], ttl: Union[int, Dict[str, int]] = None, local: bool = False):
+        """
+        Stores several key-value pairs with one pipelined round trip of SET commands.
+        ttl may also map each key to its own TTL.
+        """
+        if not items:
+            return
+        if local:
+            for key, value in items.items():
+                self.local_cache.set(key, value)
+        if self.client is None:
+            await self.connect()
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+                    key_ttl = key_ttl if key_ttl is not None else self.ttl
+                    pipe.set(key, dumps_str(value), ex=int(key_ttl) or None)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Redis set_many error: {e}")
+
+
+    async def get_many_or_load(
+        self,
+        keys: List[str],
+        load: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        ttl: Union[int, Dict[str, int]] = None,
+        local: bool = False,
+        generations: Dict[str, str] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieves several values, loading the missing ones with load(keys), without stampedes:
+
+        - a key being loaded in this process is awaited rather than loaded again (single flight)
+        - across processes, only the holder of the key's Redis lock loads it while the others
+          wait for the result to appear
+        - entries are refreshed in the background shortly before they expire, with XFetch's
+          probabilistic early expiration, and stay readable for CACHE_STALE_TTL after expiring
+          so readers are served stale-while-revalidate instead of waiting
+
+        Values are stored wrapped with their expiry and load time. Keys load() cannot resolve
+        are missing from the result.
+
+        generations may map keys to Redis counters that writers bump (bump_generation) when they
+        invalidate the key. A value is then only stored if its counter did not move while it was
+        loaded, so a load racing an invalidation cannot write the superseded value back.
+        """
+        envelopes = await self.get_many(keys, local=local)
+        values = {}
+        missing = []
+        stale = []
+        now = time.time()
+        for key in keys:
+            envelope = envelopes.get(key)
+            if not self._is_envelope(envelope):
+                missing.append(key)
+                continue
+            values[key] = envelope["value"]
+            if self._should_refresh(envelope, now):
+                stale.append(key)
+
+        if stale:
+            self._refresh_in_background(stale, load, ttl, local, generations)
+        if missing:
+            values.update(await self._load_once(missing, load, ttl, local, generations=generations))
+        return values
+
+
+    @staticmethod
+    def _is_envelope(value) -> bool:
+        return isinstance(value, dict) and "value" in value and "expires_at" in value
+
+
+    def _should_refresh(self, envelope: dict, now: float) -> bool:
+        """
+        XFetch: refresh early with a probability that grows as expiry approaches,
+        scaled by how long the value took to load.
+        """
+        if envelope["expires_at"] is None:
+            return False
+        jitter = -envelope.get("delta", 0) * self.xfetch_beta * math.log(1.0 - random.random())
+        return now + jitter >= envelope["expires_at"]
+
+
+    def _refresh_in_background(self, keys: List[str], load, ttl, local: bool, generations: Dict[str, str] = None):
+        keys = [key for key in keys if key not in self._loading]
+        if not keys:
+            return
+        task = asyncio.create_task(self._load_once(keys, load, ttl, local, background=True, generations=generations))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_done)
+
+
+    def _refresh_done(self, task: asyncio.Task):
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Cache background refresh error: {task.exception()}", flush=True)
+
+
+    async def _load_once(self, keys: List[str], load, ttl, local: bool, background: bool = False, generations: Dict[str, str] = None) -> Dict[str, Any]:
+        """
+        Loads keys, joining loads of the same keys already running in this process.
+        """
+        loop = asyncio.get_running_loop()
+        joined = {}
+        owned = []
+        for key in keys:
+            if key in self._loading:
+                joined[key] = (self._loading[key], key in self._refreshing)
+            else:
+                self._loading[key] = loop.create_future()
+                if background:
+                    self._refreshing.add(key)
+                owned.append(key)
+
+        values = {}
+        if owned:
+            try:
+                values.update(await self._load_with_lock(owned, load, ttl, local, background, generations))
+                for key in owned:
+                    self._loading[key].set_result(values.get(key))
+            except Exception as e:
+                for key in owned:
+                    self._loading[key].set_exception(e)
+                    self._loading[key].exception()  # Marks it retrieved when nobody joined
+                raise
+            finally:
+                for key in owned:
+                    future = self._loading.pop(key)
+                    self._refreshing.discard(key)
+                    if not future.done():
+                        future.cancel()
+
+        unresolved = []
+        for key, (future, refreshing) in joined.items():
+            try:
+                value = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The task owning the load was cancelled; load the key ourselves
+                unresolved.append(key)
+                continue
+            if value is not None:
+                values[key] = value
+            elif refreshing:
+                unresolved.append(key)
+        # A joined load may have been abandoned, or a background refresh given way to another process's lock
+        if unresolved and not background:
+            values.update(await self._load_with_lock(unresolved, load, ttl, local, generations=generations))
+        return values
+
+
+    async def _load_with_lock(self, keys: List[str], load, ttl, local: bool, background: bool = False, generations: Dict[str, str] = None) -> Dict[str, Any]:
+        """
+        Loads the keys whose Redis lock this process wins and waits for the others to be stored
+        by their lock holders, loading them itself only if that takes longer than the lock timeout.
+        A background refresh simply skips keys someone else is already refreshing.
+        """
+        token = uuid4().hex
+        locked, contended = await self._acquire_locks(keys, token)
+
+        values = {}
+        if locked:
+            try:
+                values.update(await self._load_and_store(locked, load, ttl, local, generations))
+            finally:
+                await self._release_locks(locked, token)
+        if contended and not background:
+            values.update(await self._wait_for_holders(contended, local))
+            leftover = [key for key in contended if key not in values]
+            if leftover:
+                values.update(await self._load_and_store(leftover, load, ttl, local, generations))
+        return values
+
+
+    async def _acquire_locks(self, keys: List[str], token: str):
+        if self.client is None:
+            await self.connect()
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(f"{key}:lock", token, nx=True, px=self.lock_timeout_ms)
+                acquired = await pipe.execute()
+        except Exception as e:
+            # Without Redis, fall back to single flight within this process
+            print(f"Redis lock error: {e}")
+            return list(keys), []
+        locked = [key for key, ok in zip(keys, acquired) if ok]
+        contended = [key for key, ok in zip(keys, acquired) if not ok]
+        return locked, contended
+
+
+    async def _release_locks(self, keys: List[str], token: str):
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.eval(_RELEASE_LOCK_SCRIPT, 1, f"{key}:lock", token)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Redis unlock error: {e}")
+
+
+    async def _wait_for_holders(self, keys: List[str], local: bool) -> Dict[str, Any]:
+        values = {}
+        remaining = list(keys)
+        deadline = time.monotonic() + self.lock_timeout_ms / 1000
+        while remaining and time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            envelopes = await self.get_many(remaining, local=local)
+            for key, envelope in envelopes.items():
+                if self._is_envelope(envelope):
+                    values[key] = envelope["value"]
+            remaining = [key for key in remaining if key not in values]
+            if remaining:
+                # Stop waiting on keys whose holder finished without storing a value
+                try:
+                    locks = await self.client.mget([f"{key}:lock" for key in remaining])
+                except Exception as e:
+                    print(f"Redis mget error: {e}")
+                    break
+                remaining = [key for key, lock in zip(remaining, locks) if lock is not None]
+        return values
+
+
+    async def _load_and_store(self, keys: List[str], load, ttl, local: bool, generations: Dict[str, str] = None) -> Dict[str, Any]:
+        guarded = {key: generations[key] for key in keys if generations and key in generations}
+        expected = await self._read_generations(guarded)
+        started_at = time.time()
+        loaded = await load(keys)
+        now = time.time()
+        envelopes = {}
+        redis_ttls = {}
+        for key, value in loaded.items():
+            if value is None:
+                continue
+            key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+            key_ttl = int(key_ttl if key_ttl is not None else self.ttl)
+            envelopes[key] = {"value": value, "delta": now - started_at, "expires_at": now + key_ttl if key_ttl else None}
+            # Kept past its soft expiry so it can still be served while being refreshed
+            redis_ttls[key] = key_ttl + self.stale_ttl if key_ttl else 0
+        await self.set_many({key: envelope for key, envelope in envelopes.items() if key not in guarded}, ttl=redis_ttls, local=local)
+        await self._store_if_generation(
+            {key: envelope for key, envelope in envelopes.items() if key in guarded}, guarded, expected, redis_ttls, local
+        )
+        return {key: envelope["value"] for key, envelope in envelopes.items()}
+
+
+    async def _read_generations(self, guarded: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """
+        Reads the generation counters of guarded keys; None if Redis is unavailable.
+        """
+        if not guarded:
+            return {}
+        try:
+            counters = await self.client.mget(list(guarded.values()))
+        except Exception as e:
+            print(f"Redis mget error: {e}")
+            return None
+        return {key: counter or "" for key, counter in zip(guarded, counters)}
+
+
+    async def _store_if_generation(self, envelopes: Dict[str, Any], guarded: Dict[str, str], expected, redis_ttls: Dict[str, int], local: bool):
+        """
+        Stores each value only if its generation counter still holds the value read before loading.
+        """
+        if not envelopes or expected is None:
+            return
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, envelope in envelopes.items():
+                    pipe.eval(_STORE_IF_GENERATION_SCRIPT, 2, key, guarded[key], dumps_str(envelope), redis_ttls[key], expected[key])
+                stored = await pipe.execute()
+        except Exception as e:
+            print(f"Redis store error: {e}")
+            return
+        for (key, envelope), was_stored in zip(envelopes.items(), stored):
+            if not was_stored:
+                print(f"[CacheService] Not caching {key}: invalidated while loading", flush=True)
+            elif local:
+                self.local_cache.set(key, envelope)
+
+
+    async def bump_generation(self, *keys: str):
+        """
+        Increments generation counters, so loads that started before are not stored.
+        """
+        if self.client is None:
+            await self.connect()
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.incr(key)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Redis incr error: {e}")
+
+
+    async def get_by_prefix(self, prefix: str) -> Dict[str, Any]:
+        """
+        Retrieves every key starting with prefix, using SCAN rather than KEYS.
+        """
+        if self.client is None:
+            await self.connect()
+        try:
+            keys = [key async for key in self.client.scan_iter(match=f"{prefix}*")]
+        except Exception as e:
+            print(f"Redis scan error: {e}")
+            return {}
+        return await self.get_many(keys) if keys else {}
+
+
+    async def delete(self, *keys: str):
+        """
+        Deletes keys from Redis and the in-process cache.
+        """
+        for key in keys:
+            self.local_cache.delete(key)
+        if self.client is None:
+            await self.connect()
+        try:
+            await self.client.delete(*keys)
         except Exception as e:
             print(f"Redis delete error: {e}")
-    
+
+
+    async def incr(self, key: str, amount: int = 1, ttl: int = None) -> Optional[int]:
+        """
+        Atomically adds amount to an integer key and returns the new value, or None if Redis
+        is unavailable. With a ttl, the key's expiry is (re)set to it.
+        """
+        if self.client is None:
+            await self.connect()
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.incrby(key, amount)
+                if ttl:
+                    pipe.expire(key, int(ttl))
+                value, *_ = await pipe.execute()
+            return value
+        except Exception as e:
+            print(f"Redis incr error: {e}")
+            return None
+
+
+    async def set_if_absent(self, key: str, value: Any, ttl: int = None) -> Tuple[bool, Any]:
+        """
+        Stores value only if key does not exist yet (SET NX). Returns (True, value) when it was
+        stored and (False, existing value) otherwise. Without Redis, every call claims the key.
+        """
+        if self.client is None:
+            await self.connect()
+        try:
+            ttl = ttl if ttl is not None else self.ttl
+            if await self.client.set(key, dumps_str(value), ex=int(ttl) or None, nx=True):
+                return True, value
+            existing = await self.client.get(key)
+        except Exception as e:
+            print(f"Redis set_if_absent error: {e}")
+            return True, value
+        if existing is None:
+            # Expired in between; try again
+            return await self.set_if_absent(key, value, ttl)
+        return False, loads(existing)
+
+
+    async def publish(self, channel: str, message: dict):
+        """
+        Publishes a message to every subscriber of a Redis pub/sub channel.
+        """
+        if self.client is None:
+            await self.connect()
+        try:
+            await self.client.publish(channel, dumps_str(message))
+        except Exception as e:
+            print(f"Redis publish error: {e}")
+
+
+    async def listen(self, channel: str, handler: Callable[[dict], Awaitable[None]], retry_interval: float = 1.0):
+        """
+        Subscribes to a Redis pub/sub channel and calls handler for each message until cancelled,
+        resubscribing after connection errors. Messages published while disconnected are lost,
+        so the in-process cache is cleared on every resubscription.
+        """
+        if self.client is None:
+            await self.connect()
+        subscribed_before = False
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(channel)
+                if subscribed_before:
+                    self.local_cache.clear()
+                subscribed_before = True
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        await handler(loads(message["data"]))
+                    except Exception as e:
+                        print(f"Redis subscriber handler error on {channel}: {e}", flush=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Redis subscription error on {channel}: {e}", flush=True)
+                await asyncio.sleep(retry_interval)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
 
     async def exists(self, key: str) -> bool:
         """
@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+
+class LocalCache:
+    """
+    A small in-process LRU cache with a per-entry TTL, used in front of Redis.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """
+        Returns the cached value, or None if it is missing or expired.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value, ttl: float = None):
+        """
+        Stores a value, evicting the least recently used entry when full.
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """
+        Removes a key if present.
+        """
+        self.entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        self.entries.clear()
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+class BufferedWriter:
+    """
+    Write-behind batching of database writes. Entries submitted within a short window, or
+    until max_batch_size of them are waiting, are handed to write_batch together.
+    Each submission gets a future resolved once its batch is committed, with the value
+    write_batch returned for it, if it returns one value per entry.
+    """
+
+    def __init__(self, write_batch: Callable[[List[Any]], Awaitable[Optional[List[Any]]]], description: str, flush_interval_ms: int, max_batch_size: int):
+        self.write_batch = write_batch
+        self.description = description
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.buffer = []
+        self._flush_loop_task = None
+        self._batch_full = asyncio.Event()
+
+    def start(self):
+        """
+        Starts the periodic flush loop. Must be called from the running loop; submitting starts it otherwise.
+        """
+        if self._flush_loop_task is None:
+            self._flush_loop_task = asyncio.create_task(self._flush_loop())
+
+    def _enqueue(self, entry: Any) -> asyncio.Future:
+        """
+        Buffers an entry and returns the future resolved once it is stored.
+        """
+        self.start()
+        stored = asyncio.get_running_loop().create_future()
+        self.buffer.append((entry, stored))
+        if len(self.buffer) >= self.max_batch_size:
+            self._batch_full.set()
+        return stored
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            await self.flush()
+
+    async def flush(self):
+        """
+        Writes everything buffered so far, one write_batch call per batch.
+        """
+        while self.buffer:
+            batch, self.buffer = self.buffer[:self.max_batch_size], self.buffer[self.max_batch_size:]
+            try:
+                results = await self.write_batch([entry for entry, _ in batch])
+            except Exception as e:
+                print(f"❌ Error storing {len(batch)} {self.description}: {e}", flush=True)
+                for _, stored in batch:
+                    if not stored.done():
+                        stored.set_exception(e)
+                        stored.exception()  # Nobody may be waiting; the error is logged above
+                continue
+            if results is None:
+                results = [None] * len(batch)
+            for result, (_, stored) in zip(results, batch):
+                if not stored.done():
+                    stored.set_result(result)
+
+    async def close(self):
+        """
+        Stops the flush loop and stores whatever is still buffered.
+        """
+        if self._flush_loop_task is not None:
+            self._flush_loop_task.cancel()
+            try:
+                await self._flush_loop_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_loop_task = None
+        await self.flush()
@@ -10,12 +10,85 @@ class Config:
     REDIS_DB = os.getenv("REDIS_DB", 0)
     REDIS_TTL = os.getenv("REDIS_TTL", 3600)
     REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+
+    # In-process cache in front of Redis (explanation versions)
+    LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", 1024))
+    LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", 60))
+
+    RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 86400))
+    PROMPT_TEMPLATE_CACHE_MAX_ENTRIES = int(os.getenv("PROMPT_TEMPLATE_CACHE_MAX_ENTRIES", 512))
+
+    # Explanation cache lifetimes; numbered versions are immutable, 0 means no expiry.
+    # Writes publish on the invalidation channel, so LATEST does not rely on expiring.
+    EXPLANATION_VERSION_CACHE_TTL = int(os.getenv("EXPLANATION_VERSION_CACHE_TTL", 0))
+    EXPLANATION_LATEST_CACHE_TTL = int(os.getenv("EXPLANATION_LATEST_CACHE_TTL", 86400))
+    EXPLANATION_INVALIDATION_CHANNEL = os.getenv("EXPLANATION_INVALIDATION_CHANNEL", "explanation_invalidation")
+
+    # Stampede protection for loaded cache entries: a distributed lock per key, and
+    # XFetch early refresh while expired entries keep being served for CACHE_STALE_TTL
+    CACHE_LOCK_TIMEOUT_MS = int(os.getenv("CACHE_LOCK_TIMEOUT_MS", 5000))
+    CACHE_LOCK_POLL_INTERVAL_MS = int(os.getenv("CACHE_LOCK_POLL_INTERVAL_MS", 50))
+    CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", 300))
+    CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", 1.0))
 
     RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "localhost")
     RABBITMQ_PORT = os.getenv("RABBITMQ_PORT", 5672)
     RABBITMQ_USER = os.getenv("RABBITMQ_USER", "guest")
     RABBITMQ_PASSWORD = os.getenv("RABBITMQ_PASSWORD", "guest")
     RABBITMQ_URL = f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASSWORD}@{RABBITMQ_HOST}:{RABBITMQ_PORT}"
+    RABBITMQ_CHANNEL_POOL_SIZE = int(os.getenv("RABBITMQ_CHANNEL_POOL_SIZE", 10))
+    RABBITMQ_HEALTH_CHECK_INTERVAL = int(os.getenv("RABBITMQ_HEALTH_CHECK_INTERVAL", 30))
+    # Queues remembered as declared, so publishing skips the declare; per-request result queues make it an LRU
+    RABBITMQ_DECLARED_QUEUES_MEMORY = int(os.getenv("RABBITMQ_DECLARED_QUEUES_MEMORY", 1000))
+    # "exchange" or legacy per-request "queue". Workers older than the results exchange ignore reply_to
+    # and always answer on the per-request queue, so switch to "exchange" only after upgrading every worker.
+    RESULT_TRANSPORT = os.getenv("RESULT_TRANSPORT", "queue")
+    RESULT_EXCHANGE_NAME = os.getenv("RESULT_EXCHANGE_NAME", "humanization_results")
+    # Results buffered per request in the API; a consumer falling further behind fails its request
+    RESULT_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("RESULT_SUBSCRIBER_QUEUE_SIZE", 1024))
+    # Fanout exchange carrying cancellations of abandoned requests to every worker; ids cancelled
+    # before their task was picked up are remembered so the task is skipped when it arrives
+    CONTROL_EXCHANGE_NAME = os.getenv("CONTROL_EXCHANGE_NAME", "humanization_control")
+    CANCELLED_REQUESTS_MEMORY = int(os.getenv("CANCELLED_REQUESTS_MEMORY", 10000))
+    # Queue message encodings. Tasks are not negotiated: keep "json" until every worker understands
+    # "compact". Results are negotiated per task, so "frame" is only used with workers that send it.
+    TASK_WIRE_FORMAT = os.getenv("TASK_WIRE_FORMAT", "json")
+    RESULT_WIRE_FORMAT = os.getenv("RESULT_WIRE_FORMAT", "frame")
+
+    # Token coalescing: flush when the buffer reaches MAX_BYTES or after WINDOW_MS. A WINDOW_MS of 0 disables
+    # coalescing altogether, MAX_BYTES included: pieces are sent as they arrive
+    STREAM_COALESCE_MAX_BYTES = int(os.getenv("STREAM_COALESCE_MAX_BYTES", 256))
+    STREAM_COALESCE_WINDOW_MS = int(os.getenv("STREAM_COALESCE_WINDOW_MS", 20))
+    WEBSOCKET_COALESCE_MAX_BYTES = int(os.getenv("WEBSOCKET_COALESCE_MAX_BYTES", 256))
+    WEBSOCKET_COALESCE_WINDOW_MS = int(os.getenv("WEBSOCKET_COALESCE_WINDOW_MS", 0))
+    # Forward worker result messages to WebSocket clients verbatim (requests JSON results, skips API-side coalescing)
+    WEBSOCKET_PASS_THROUGH = os.getenv("WEBSOCKET_PASS_THROUGH", "false").lower() == "true"
+    # Multiplexed sockets (?multiplex=1): concurrent and waiting requests per socket, outgoing message buffer
+    WEBSOCKET_MAX_CONCURRENT_REQUESTS = int(os.getenv("WEBSOCKET_MAX_CONCURRENT_REQUESTS", 8))
+    WEBSOCKET_MAX_PENDING_REQUESTS = int(os.getenv("WEBSOCKET_MAX_PENDING_REQUESTS", 32))
+    WEBSOCKET_SEND_QUEUE_SIZE = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", 256))
+    # HTTP endpoints: time allowed for one humanization, and batch limits
+    HTTP_REQUEST_TIMEOUT = int(os.getenv("HTTP_REQUEST_TIMEOUT", 120))
+    HTTP_BATCH_MAX_SIZE = int(os.getenv("HTTP_BATCH_MAX_SIZE", 1000))
+    HTTP_BATCH_CONCURRENCY = int(os.getenv("HTTP_BATCH_CONCURRENCY", 16))
+
+    # Task lanes: interactive requests and HTTP batches are queued separately. Workers share
+    # slots between lanes by weight and cap the batch lane's share, so batches fill spare capacity.
+    INTERACTIVE_TASK_QUEUE = os.getenv("INTERACTIVE_TASK_QUEUE", "humanization_task")
+    BATCH_TASK_QUEUE = os.getenv("BATCH_TASK_QUEUE", "humanization_task_batch")
+    INTERACTIVE_LANE_WEIGHT = int(os.getenv("INTERACTIVE_LANE_WEIGHT", 4))
+    BATCH_LANE_WEIGHT = int(os.getenv("BATCH_LANE_WEIGHT", 1))
+    BATCH_LANE_MAX_SHARE = float(os.getenv("BATCH_LANE_MAX_SHARE", 0.75))
+    # Per-tenant (API key) tasks per lane and window, enforced at enqueue time (0 disables)
+    TENANT_API_KEY_HEADER = os.getenv("TENANT_API_KEY_HEADER", "X-API-Key")
+    TENANT_QUOTA_WINDOW = int(os.getenv("TENANT_QUOTA_WINDOW", 60))
+    TENANT_INTERACTIVE_QUOTA = int(os.getenv("TENANT_INTERACTIVE_QUOTA", 0))
+    TENANT_BATCH_QUOTA = int(os.getenv("TENANT_BATCH_QUOTA", 0))
+
+    # Offline JSONL batch job (python -m worker.batch_job)
+    BATCH_JOB_CONCURRENCY = int(os.getenv("BATCH_JOB_CONCURRENCY", 16))
+    BATCH_JOB_FLUSH_SIZE = int(os.getenv("BATCH_JOB_FLUSH_SIZE", 500))
     
     POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
     POSTGRES_PORT = os.getenv("POSTGRES_PORT", 5432)
@@ -32,4 +105,43 @@ class Config:
 
     ADJUST_CONCURRENCY_INTERVAL = int(os.getenv("ADJUST_CONCURRENCY_INTERVAL", 5))
 
+    # Database engine profile; the pool is sized so every concurrent worker task can hold a connection
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", MAX_CONCURRENT_TASKS))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", max(MAX_CONCURRENT_TASKS // 2, 5)))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500))
+    DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+    # Write-behind persistence of humanization results in the worker
+    RESULT_WRITE_FLUSH_INTERVAL_MS = int(os.getenv("RESULT_WRITE_FLUSH_INTERVAL_MS", 200))
+    RESULT_WRITE_MAX_BATCH_SIZE = int(os.getenv("RESULT_WRITE_MAX_BATCH_SIZE", 100))
+    # A failed result write is retried in the worker, with the delay doubling between attempts
+    RESULT_WRITE_MAX_ATTEMPTS = int(os.getenv("RESULT_WRITE_MAX_ATTEMPTS", 5))
+    RESULT_WRITE_RETRY_DELAY_MS = int(os.getenv("RESULT_WRITE_RETRY_DELAY_MS", 500))
+
+    # Request ids are reserved from the database sequence in blocks; request rows are written behind
+    REQUEST_ID_BLOCK_SIZE = int(os.getenv("REQUEST_ID_BLOCK_SIZE", 100))
+    REQUEST_WRITE_FLUSH_INTERVAL_MS = int(os.getenv("REQUEST_WRITE_FLUSH_INTERVAL_MS", 50))
+    REQUEST_WRITE_MAX_BATCH_SIZE = int(os.getenv("REQUEST_WRITE_MAX_BATCH_SIZE", 500))
+    IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 86400))
+
+    # Feedback ingestion
+    FEEDBACK_WRITE_FLUSH_INTERVAL_MS = int(os.getenv("FEEDBACK_WRITE_FLUSH_INTERVAL_MS", 20))
+    FEEDBACK_WRITE_MAX_BATCH_SIZE = int(os.getenv("FEEDBACK_WRITE_MAX_BATCH_SIZE", 500))
+    FEEDBACK_COPY_BATCH_SIZE = int(os.getenv("FEEDBACK_COPY_BATCH_SIZE", 5000))
+
+    # AIMD concurrency control driven by upstream LLM signals
+    AIMD_ADDITIVE_INCREASE = int(os.getenv("AIMD_ADDITIVE_INCREASE", 1))
+    AIMD_DECREASE_FACTOR = float(os.getenv("AIMD_DECREASE_FACTOR", 0.5))
+    AIMD_TTFT_TARGET_MS = int(os.getenv("AIMD_TTFT_TARGET_MS", 3000))
+    AIMD_ERROR_RATE_THRESHOLD = float(os.getenv("AIMD_ERROR_RATE_THRESHOLD", 0.05))
+    AIMD_TOKENS_PER_SECOND_DROP_RATIO = float(os.getenv("AIMD_TOKENS_PER_SECOND_DROP_RATIO", 0.5))
+    RESOURCE_SAMPLE_INTERVAL = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", 1))
+    RESOURCE_SAMPLE_SMOOTHING = float(os.getenv("RESOURCE_SAMPLE_SMOOTHING", 0.3))
+    METRICS_PUBLISH_INTERVAL = int(os.getenv("METRICS_PUBLISH_INTERVAL", 5))
+    CPU_USAGE_CAP = int(os.getenv("CPU_USAGE_CAP", 80))
+    MEMORY_USAGE_CAP = int(os.getenv("MEMORY_USAGE_CAP", 80))
+
 
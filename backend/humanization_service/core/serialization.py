@@ -0,0 +1,41 @@
+"""
+Single place where the service turns objects into JSON and back. The API, worker, cache
+and queue layers all go through dumps/loads, so values are encoded exactly once and with
+the fastest encoder available.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson  # Installed from the Pipfile; the standard library only covers environments without it
+except ImportError:
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else None
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encodes a value as compact UTF-8 JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps_str(value: Any) -> str:
+    """
+    Encodes a value as compact JSON text, for text transports (Redis, WebSocket text frames).
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS).decode()
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decodes JSON from bytes or text.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
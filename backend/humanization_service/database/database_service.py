@@ -1,14 +1,57 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from core.config import Config
 
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long checkouts wait for a connection and how often they time out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checkout_timeouts = 0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started_at
+            self.checkouts += 1
+            self.checkout_wait_total += waited
+            self.checkout_wait_max = max(self.checkout_wait_max, waited)
+
+
 class DatabaseService:
     """
     A generic database service that abstracts database interactions using async SQLAlchemy.
     """
     def __init__(self):
-        db_url = Config.DATABASE_URL_ASYNC_PG
-        self.engine = create_async_engine(db_url, echo=True, future=True)
+        db_url = make_url(Config.DATABASE_URL_ASYNC_PG).update_query_dict({
+            "prepared_statement_cache_size": str(Config.DB_STATEMENT_CACHE_SIZE),
+        })
+        self.engine = create_async_engine(
+            db_url,
+            echo=Config.DB_ECHO,
+            future=True,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_timeout=Config.DB_POOL_TIMEOUT,
+            pool_recycle=Config.DB_POOL_RECYCLE,
+            pool_pre_ping=Config.DB_POOL_PRE_PING,
+        )
         self.session_factory = sessionmaker(
             bind=self.engine,
             class_=AsyncSession,
@@ -22,6 +65,15 @@ class DatabaseService:
         async with self.session_factory() as session:
             yield session
 
+    @asynccontextmanager
+    async def connection(self) -> AsyncConnection:
+        """
+        Provides a Core connection inside a transaction that commits on exit, bypassing the
+        ORM session and identity map for hot-path queries.
+        """
+        async with self.engine.begin() as connection:
+            yield connection
+
     async def execute(self, query):
         """
         Executes a query and commits the transaction.
@@ -47,6 +99,23 @@ class DatabaseService:
             result = await session.execute(query)
             return result.scalars().all()
 
+    def pool_stats(self) -> dict:
+        """
+        Returns connection pool utilization for monitoring.
+        """
+        pool = self.engine.pool
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": Config.DB_MAX_OVERFLOW,
+            "checkouts": pool.checkouts,
+            "checkout_wait_avg_ms": round(pool.checkout_wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            "checkout_wait_max_ms": round(pool.checkout_wait_max * 1000, 3),
+            "checkout_timeouts": pool.checkout_timeouts,
+        }
+
     async def close(self):
         """
         Closes the database connection.
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from database.database_service import Base
+
+class ExplanationCurrentVersion(Base):
+    """
+    Points each scale at its latest explanation version, so resolving LATEST is a primary key lookup.
+    Maintained by ExplanationRepository.create_explanation.
+    """
+    __tablename__ = "explanation_current_versions"
+
+    scale_name = Column(String, primary_key=True)
+    explanation_version_id = Column(Integer, ForeignKey("explanation_versions.id"), nullable=False)
+    version_number = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, JSON
+from sqlalchemy import Column, Integer, String, DateTime, func, JSON, Index
 from database.database_service import DatabaseService, Base
 from sqlalchemy import select
 
@@ -14,3 +14,8 @@ class ExplanationVersion(Base):
     description = Column(String, nullable=False)
     examples = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Serves both the numbered lookup and the id ordering used to pick the newest row
+        Index("ix_explanation_versions_scale_version_id", scale_name, version_number, id.desc()),
+    )
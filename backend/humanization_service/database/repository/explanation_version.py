@@ -1,6 +1,51 @@
-from sqlalchemy import select, text
+from sqlalchemy import select, insert, func, text, or_, tuple_, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, List, Optional, Tuple
 from database.database_service import DatabaseService
 from database.model.explanation_version import ExplanationVersion
+from database.model.explanation_current_version import ExplanationCurrentVersion
+
+_explanations = ExplanationVersion.__table__
+_current_versions = ExplanationCurrentVersion.__table__
+
+_SELECT_LATEST_EXPLANATION = (
+    select(_explanations)
+    .join(_current_versions, _current_versions.c.explanation_version_id == _explanations.c.id)
+    .where(_current_versions.c.scale_name == bindparam("scale_name"))
+)
+_SELECT_EXPLANATION_VERSION = (
+    select(_explanations)
+    .where(_explanations.c.scale_name == bindparam("scale_name"))
+    .where(_explanations.c.version_number == bindparam("version_number"))
+    .order_by(_explanations.c.id.desc())
+    .limit(1)
+)
+_INSERT_EXPLANATION = (
+    insert(_explanations)
+    .values(
+        version_number=bindparam("version_number"),
+        scale_name=bindparam("scale_name"),
+        description=bindparam("description"),
+        examples=bindparam("examples"),
+    )
+    .returning(*_explanations.c)
+)
+
+# Moves the scale's pointer forward, never back to an older row
+_upsert_current_version = pg_insert(_current_versions).values(
+    scale_name=bindparam("scale_name"),
+    explanation_version_id=bindparam("explanation_version_id"),
+    version_number=bindparam("version_number"),
+)
+_UPSERT_CURRENT_VERSION = _upsert_current_version.on_conflict_do_update(
+    index_elements=[_current_versions.c.scale_name],
+    set_={
+        "explanation_version_id": _upsert_current_version.excluded.explanation_version_id,
+        "version_number": _upsert_current_version.excluded.version_number,
+        "updated_at": func.now(),
+    },
+    where=_current_versions.c.explanation_version_id < _upsert_current_version.excluded.explanation_version_id,
+)
 
 class ExplanationRepository:
     """
@@ -20,29 +65,75 @@ class ExplanationRepository:
 
     async def create_explanation(self, version_number: int, scale_name: str, description: str, examples: str):
         """
-        Creates a new explanation scale.
+        Creates a new explanation scale and makes it the current version of its scale,
+        in the same transaction.
         """
-        async for session in self.db_service.get_session():
-            explanation = ExplanationVersion(
-                version_number=version_number,
-                scale_name=scale_name,
-                description=description,
-                examples=examples
-            )
-            session.add(explanation)
-            await session.commit()
-            return explanation
+        async with self.db_service.connection() as connection:
+            result = await connection.execute(_INSERT_EXPLANATION, {
+                "version_number": version_number,
+                "scale_name": scale_name,
+                "description": description,
+                "examples": examples,
+            })
+            row = result.one()
+            await connection.execute(_UPSERT_CURRENT_VERSION, {
+                "scale_name": row.scale_name,
+                "explanation_version_id": row.id,
+                "version_number": row.version_number,
+            })
+        return ExplanationVersion(**row._mapping)
 
     async def get_explanation(self, scale_name: str, version_number: int = None):
         """
         Retrieves the latest explanation scale by version and scale name.
         If version_number is not provided, retrieves the latest explanation for the scale name.
         """
-        async for session in self.db_service.get_session():
-            query = select(ExplanationVersion).where(ExplanationVersion.scale_name == scale_name)
-            if version_number is not None:
-                query = query.where(ExplanationVersion.version_number == version_number)
-            query = query.order_by(ExplanationVersion.id.desc()).limit(1)
-            
-            result = await session.execute(query)
-            return result.scalars().first()
\ No newline at end of file
+        async with self.db_service.connection() as connection:
+            if version_number is None:
+                result = await connection.execute(_SELECT_LATEST_EXPLANATION, {"scale_name": scale_name})
+            else:
+                result = await connection.execute(_SELECT_EXPLANATION_VERSION, {"scale_name": scale_name, "version_number": int(version_number)})
+            row = result.one_or_none()
+        return ExplanationVersion(**row._mapping) if row is not None else None
+
+    async def get_explanations(self, lookups: List[Tuple[str, Optional[int]]]) -> Dict[Tuple[str, Optional[int]], ExplanationVersion]:
+        """
+        Resolves several (scale_name, version_number) pairs with a single query.
+        A version_number of None resolves to the latest explanation of that scale.
+        Pairs that cannot be resolved are missing from the result.
+        """
+        latest_scales = {scale_name for scale_name, version_number in lookups if version_number is None}
+        numbered = {(scale_name, version_number) for scale_name, version_number in lookups if version_number is not None}
+        if not latest_scales and not numbered:
+            return {}
+
+        conditions = []
+        if latest_scales:
+            latest_ids = (
+                select(_current_versions.c.explanation_version_id)
+                .where(_current_versions.c.scale_name.in_(latest_scales))
+            )
+            conditions.append(ExplanationVersion.id.in_(latest_ids))
+        if numbered:
+            numbered_ids = (
+                select(ExplanationVersion.id)
+                .where(tuple_(ExplanationVersion.scale_name, ExplanationVersion.version_number).in_(numbered))
+                .distinct(ExplanationVersion.scale_name, ExplanationVersion.version_number)
+                .order_by(ExplanationVersion.scale_name, ExplanationVersion.version_number, ExplanationVersion.id.desc())
+            )
+            conditions.append(ExplanationVersion.id.in_(numbered_ids))
+
+        async with self.db_service.connection() as connection:
+            result = await connection.execute(select(_explanations).where(or_(*conditions)))
+            rows = [ExplanationVersion(**row._mapping) for row in result]
+
+        explanations = {}
+        for row in sorted(rows, key=lambda row: row.id):
+            if row.scale_name in latest_scales:
+                # LATEST rows come in through the explanation_current_versions pointer, which only moves
+                # forward and so references its scale's highest id. Visiting rows in id order keeps it
+                # over older rows of the same scale that numbered lookups also returned.
+                explanations[(row.scale_name, None)] = row
+            if (row.scale_name, row.version_number) in numbered:
+                explanations[(row.scale_name, row.version_number)] = row
+        return explanations
@@ -1,7 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from database.database_service import DatabaseService
 from database.model.feedback import Feedback
+from typing import List, Tuple
 
 class FeedbackRepository:
     """
@@ -23,4 +24,41 @@ class FeedbackRepository:
             session.add(feedback)
             await session.commit()
             await session.refresh(feedback)
-            return feedback
\ No newline at end of file
+            return feedback
+
+    async def create_feedback_many(self, entries: List[Tuple[int, int]]) -> List[int]:
+        """
+        Creates several feedback entries with one executemany INSERT and returns their ids in order.
+        Each entry is a (request_id, feedback_score) pair.
+        """
+        if not entries:
+            return []
+        # executemany with sort_by_parameter_order: a multi-row VALUES insert does not
+        # guarantee RETURNING rows come back in the order of its entries
+        statement = insert(Feedback.__table__).returning(Feedback.__table__.c.id, sort_by_parameter_order=True)
+        async with self.db_service.connection() as connection:
+            result = await connection.execute(
+                statement,
+                [{"request_id": request_id, "feedback_score": feedback_score} for request_id, feedback_score in entries]
+            )
+            return [row.id for row in result]
+
+    async def copy_feedback(self, entries: List[Tuple[int, int]]) -> int:
+        """
+        Bulk-loads feedback entries with the PostgreSQL COPY protocol and returns how many were loaded.
+        The COPY commits or rolls back with the transaction it runs in.
+        Each entry is a (request_id, feedback_score) pair.
+        """
+        if not entries:
+            return 0
+        async with self.db_service.connection() as connection:
+            # The asyncpg adapter only sends BEGIN with the first statement it executes. Issue one
+            # so the COPY on the driver connection runs inside this transaction instead of autocommitting
+            await connection.exec_driver_sql("SELECT 1")
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                Feedback.__tablename__,
+                records=entries,
+                columns=["request_id", "feedback_score"],
+            )
+            return len(entries)
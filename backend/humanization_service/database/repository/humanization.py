@@ -1,8 +1,63 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, bindparam, func, text, JSON
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from database.database_service import DatabaseService
 from database.model.humanization import HumanizationRequest
-from typing import Dict
+from typing import Dict, List
+
+_requests = HumanizationRequest.__table__
+
+# Core statements built once so SQLAlchemy's compiled cache and asyncpg's prepared
+# statement cache are hit on every call
+_INSERT_REQUEST = (
+    insert(_requests)
+    .values(
+        original_text=bindparam("original_text"),
+        parameters=bindparam("parameters"),
+        explanation_versions=bindparam("explanation_versions"),
+        model_name=bindparam("model_name"),
+    )
+    .returning(_requests.c.id, _requests.c.created_at)
+)
+
+# Arguments left as None keep the stored value
+_UPDATE_REQUEST = (
+    update(_requests)
+    .where(_requests.c.id == bindparam("request_id"))
+    .values(
+        original_text=func.coalesce(bindparam("original_text"), _requests.c.original_text),
+        parameters=func.coalesce(bindparam("parameters", type_=JSON(none_as_null=True)), _requests.c.parameters),
+        explanation_versions=func.coalesce(bindparam("explanation_versions", type_=JSON(none_as_null=True)), _requests.c.explanation_versions),
+        model_name=func.coalesce(bindparam("model_name"), _requests.c.model_name),
+        humanized_text=func.coalesce(bindparam("humanized_text"), _requests.c.humanized_text),
+        processed_at=func.now(),
+    )
+    .returning(*_requests.c)
+)
+
+_upsert_result = pg_insert(_requests).values(
+    id=bindparam("request_id"),
+    original_text=bindparam("original_text"),
+    parameters=bindparam("parameters"),
+    explanation_versions=bindparam("explanation_versions"),
+    model_name=bindparam("model_name"),
+    humanized_text=bindparam("humanized_text"),
+    processed_at=func.now(),
+)
+_UPSERT_RESULT = _upsert_result.on_conflict_do_update(
+    index_elements=[_requests.c.id],
+    set_={
+        "explanation_versions": _upsert_result.excluded.explanation_versions,
+        "humanized_text": _upsert_result.excluded.humanized_text,
+        "processed_at": _upsert_result.excluded.processed_at,
+    },
+)
+
+_INSERT_REQUEST_WITH_ID = pg_insert(_requests).on_conflict_do_nothing(index_elements=[_requests.c.id])
+
+_RESERVE_IDS = text(
+    "SELECT nextval(pg_get_serial_sequence('humanization_requests', 'id')) FROM generate_series(1, :count)"
+)
 
 class HumanizationRepository:
     """
@@ -20,19 +75,24 @@ class HumanizationRepository:
         model_name: str = None
     ) -> HumanizationRequest:
         """
-        Creates a new humanization request.
+        Creates a new humanization request with a single INSERT ... RETURNING id, created_at.
         """
-        async for session in self.db_service.get_session():
-            request = HumanizationRequest(
-                original_text=original_text,
-                parameters=parameters,
-                explanation_versions=explanation_versions,
-                model_name=model_name,
-            )
-            session.add(request)
-            await session.commit()
-            await session.refresh(request)
-            return request
+        async with self.db_service.connection() as connection:
+            result = await connection.execute(_INSERT_REQUEST, {
+                "original_text": original_text,
+                "parameters": parameters,
+                "explanation_versions": explanation_versions,
+                "model_name": model_name,
+            })
+            request_id, created_at = result.one()
+        return HumanizationRequest(
+            id=request_id,
+            original_text=original_text,
+            parameters=parameters,
+            explanation_versions=explanation_versions,
+            model_name=model_name,
+            created_at=created_at,
+        )
 
     async def update_request(
         self,
@@ -44,26 +104,78 @@ class HumanizationRepository:
         humanized_text: str = None
     ) -> HumanizationRequest | None:
         """
-        Updates an existing request with the provided details and the processed humanized text.
+        Updates an existing request with the provided details and the processed humanized text,
+        in a single UPDATE ... WHERE id = :request_id RETURNING statement.
+        """
+        async with self.db_service.connection() as connection:
+            result = await connection.execute(_UPDATE_REQUEST, {
+                "request_id": request_id,
+                "original_text": original_text,
+                "parameters": parameters,
+                "explanation_versions": explanation_versions,
+                "model_name": model_name,
+                "humanized_text": humanized_text,
+            })
+            row = result.one_or_none()
+        return HumanizationRequest(**row._mapping) if row is not None else None
+
+    async def bulk_update_requests(self, updates: List[dict]):
+        """
+        Stores the results of many processed requests with one executemany upsert.
+        Each update holds request_id, original_text, parameters, explanation_versions,
+        model_name and humanized_text. Rows the API has not inserted yet are created,
+        since the request row is written asynchronously and may arrive after the result.
+        """
+        if not updates:
+            return
+        async with self.db_service.connection() as connection:
+            await connection.execute(_UPSERT_RESULT, updates)
+
+    async def reserve_ids(self, count: int) -> List[int]:
+        """
+        Reserves a block of request ids from the table's sequence in one round trip.
         """
+        async with self.db_service.connection() as connection:
+            result = await connection.execute(_RESERVE_IDS, {"count": count})
+            return [row[0] for row in result]
+
+    async def create_requests_with_ids(self, entries: List[dict]):
+        """
+        Inserts requests under ids reserved with reserve_ids, with one executemany INSERT.
+        Each entry holds id, original_text, parameters, explanation_versions and model_name.
+        Rows whose result was already stored are left as they are.
+        """
+        if not entries:
+            return
+        async with self.db_service.connection() as connection:
+            await connection.execute(_INSERT_REQUEST_WITH_ID, entries)
+
+    async def create_completed_requests_with_ids(self, entries: List[dict]):
+        """
+        Inserts several completed requests under ids reserved with reserve_ids, with one executemany
+        INSERT. Each entry holds id, original_text, parameters, explanation_versions, model_name and
+        humanized_text. Ids that already exist are skipped, so repeating an insert is harmless.
+        """
+        if not entries:
+            return
+        statement = (
+            pg_insert(_requests)
+            .values(processed_at=func.now())
+            .on_conflict_do_nothing(index_elements=[_requests.c.id])
+        )
+        async with self.db_service.connection() as connection:
+            await connection.execute(statement, entries)
+
+    async def get_requests(self, request_ids: List[int]) -> List[HumanizationRequest]:
+        """
+        Retrieves several humanization requests by ID in one query; missing ids are skipped.
+        """
+        if not request_ids:
+            return []
         async for session in self.db_service.get_session():
-            request = await session.get(HumanizationRequest, request_id)
-            if request:
-                if original_text is not None:
-                    request.original_text = original_text
-                if parameters is not None:
-                    request.parameters = parameters
-                if explanation_versions is not None:
-                    request.explanation_versions = explanation_versions
-                if model_name is not None:
-                    request.model_name = model_name
-                if humanized_text is not None:
-                    request.humanized_text = humanized_text
-                request.processed_at = func.now()  # Mark processing completion
-                await session.commit()
-                await session.refresh(request)
-            return request
-            
+            result = await session.execute(select(HumanizationRequest).where(HumanizationRequest.id.in_(request_ids)))
+            return list(result.scalars().all())
+
     async def get_request(self, request_id: int) -> HumanizationRequest | None:
         """
         Retrieves a humanization request by ID.
@@ -5,18 +5,22 @@ class HumanizationRequestDTO(BaseModel):
     """
     DTO for humanization requests.
     """
-    request_id: int = Field(..., description="Unique identifier for the request")
+    tag: Optional[int] = Field(None, description="Client reference tagging the messages of this request on multiplexed sockets; the stored request id is allocated by the server")
     original_text: str = Field(..., min_length=1, description="Text to be humanized")
     parameters: Dict[str, int] = Field(..., description="Settings for humanization (e.g., casualness, humor)")
     parameter_explanation_versions: Optional[Dict[str, str]] = Field(None, description="Explanation versions for each parameter")
     model_name: str = Field(..., description="Name of the OpenAI model to use")
+    use_result_cache: bool = Field(False, description="Reuse the result of an identical earlier or running request instead of generating a new one")
+    idempotency_key: Optional[str] = Field(None, max_length=255, description="Client-chosen key making retries return the original request instead of running it again")
 
     @staticmethod
-    def build(request_id: int, original_text: str, parameters: Dict[str, int], model_name: str, parameter_explanation_versions: Optional[Dict[str, str]] = None):
+    def build(tag: Optional[int], original_text: str, parameters: Dict[str, int], model_name: str, parameter_explanation_versions: Optional[Dict[str, str]] = None, use_result_cache: bool = False, idempotency_key: Optional[str] = None):
         return HumanizationRequestDTO(
-            request_id=request_id,
+            tag=tag,
             original_text=original_text,
             parameters=parameters,
             parameter_explanation_versions=parameter_explanation_versions,
-            model_name=model_name
+            model_name=model_name,
+            use_result_cache=use_result_cache,
+            idempotency_key=idempotency_key
         )
\ No newline at end of file
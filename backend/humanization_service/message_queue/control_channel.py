@@ -0,0 +1,57 @@
+import aio_pika
+import uuid
+from typing import Awaitable, Callable
+from core.config import Config
+from core.serialization import dumps_str, loads
+from message_queue.message_queue_service import MessageQueueService
+from message_queue.wire_format import CONTENT_TYPE_JSON
+
+CONTROL_TYPE_CANCEL = "cancel"
+
+class RequestControlChannel:
+    """
+    Broadcasts control messages about running requests, such as cancellations, to every worker
+    through a fanout exchange. Each worker listens on its own exclusive, auto-delete queue and
+    acts on the requests it is handling.
+    """
+
+    def __init__(self, messaging_service: MessageQueueService, exchange_name: str = None):
+        self.messaging_service = messaging_service
+        self.exchange_name = exchange_name or Config.CONTROL_EXCHANGE_NAME
+        self.queue_name = f"humanization_control_{uuid.uuid4().hex}"
+        self.channel = None
+
+    async def publish_cancel(self, request_id: int):
+        """
+        Asks whichever worker handles a request to abort it.
+        """
+        await self.messaging_service.publish_to_exchange(
+            exchange_name=self.exchange_name,
+            routing_key="",
+            messages=[dumps_str({"type": CONTROL_TYPE_CANCEL, "request_id": request_id})],
+            content_type=CONTENT_TYPE_JSON,
+            exchange_type=aio_pika.ExchangeType.FANOUT
+        )
+
+    async def listen(self, handler: Callable[[dict], Awaitable[None]]):
+        """
+        Binds this process's queue to the exchange and calls handler for every control message.
+        """
+        self.channel = await self.messaging_service.open_channel()
+        exchange = await self.channel.declare_exchange(self.exchange_name, aio_pika.ExchangeType.FANOUT, durable=True)
+        queue = await self.channel.declare_queue(self.queue_name, durable=False, exclusive=True, auto_delete=True)
+        await queue.bind(exchange)
+
+        async def dispatch(message: aio_pika.abc.AbstractIncomingMessage):
+            try:
+                await handler(loads(message.body))
+            except Exception as e:
+                print(f"[RequestControlChannel] Failed to handle control message: {e}", flush=True)
+
+        await queue.consume(dispatch, no_ack=True)
+        print(f"[RequestControlChannel] Listening on control queue: {self.queue_name}", flush=True)
+
+    async def close(self):
+        if self.channel is not None and not self.channel.is_closed:
+            await self.channel.close()
+        self.channel = None
@@ -1,94 +1,266 @@
 import aio_pika
 import asyncio
+from collections import OrderedDict
+from aio_pika.pool import Pool
+from contextlib import asynccontextmanager
+from typing import List, Union
 from core.config import Config
 
+def _as_bytes(message: Union[str, bytes]) -> bytes:
+    return message if isinstance(message, bytes) else message.encode()
+
 class MessageQueueService:
     """
     A generic messaging queue service that abstracts RabbitMQ interactions using async/await.
+
+    A single robust connection and a bounded pool of publisher-confirm channels are shared
+    by every instance in the process, so publishing never pays a TCP/AMQP handshake.
     """
+    _connection = None
+    _channel_pool = None
+    _connection_lock = None
+    _declared_queues = OrderedDict()  # most recently used last, bounded: per-request queues come and go
+    _declared_exchanges = set()
+
     def __init__(self):
         self.host = Config.RABBITMQ_HOST
         self.port = Config.RABBITMQ_PORT
+        self.channel_pool_size = Config.RABBITMQ_CHANNEL_POOL_SIZE
+        self.consumer_channels = {}
 
-    async def send_message(self, queue_name: str, message: str):
+    async def _get_connection(self):
+        """
+        Returns the process-wide connection, (re)connecting if it is missing or closed.
+        """
+        cls = MessageQueueService
+        if cls._connection is not None and not cls._connection.is_closed:
+            return cls._connection
+
+        if cls._connection_lock is None:
+            cls._connection_lock = asyncio.Lock()
+        async with cls._connection_lock:
+            if cls._connection is None or cls._connection.is_closed:
+                print(f"[MessageQueueService] Connecting to RabbitMQ at {self.host}:{self.port}", flush=True)
+                cls._connection = await aio_pika.connect_robust(Config.RABBITMQ_URL)
+                cls._channel_pool = Pool(self._create_channel, max_size=self.channel_pool_size)
+                cls._declared_queues = OrderedDict()
+                cls._declared_exchanges = set()
+        return cls._connection
+
+    async def _create_channel(self):
+        """
+        Opens a pooled channel with publisher confirms enabled.
+        """
+        connection = await self._get_connection()
+        return await connection.channel(publisher_confirms=True)
+
+    @asynccontextmanager
+    async def _pooled_channel(self):
+        """
+        Acquires a channel from the pool, reopening it if it was closed by the broker.
+        """
+        await self._get_connection()
+        async with MessageQueueService._channel_pool.acquire() as channel:
+            if channel.is_closed:
+                await channel.reopen()
+            yield channel
+
+    async def _declare_queue_once(self, channel, queue_name: str):
+        """
+        Declares a durable queue the first time it is used by this process.
+        """
+        if queue_name in MessageQueueService._declared_queues:
+            MessageQueueService._declared_queues.move_to_end(queue_name)
+            return
+        await channel.declare_queue(queue_name, durable=True)
+        self._remember_queue(queue_name)
+
+    @staticmethod
+    def _remember_queue(queue_name: str):
+        """
+        Records a declared queue, forgetting the least recently used ones beyond RABBITMQ_DECLARED_QUEUES_MEMORY.
+        """
+        declared = MessageQueueService._declared_queues
+        declared[queue_name] = True
+        declared.move_to_end(queue_name)
+        while len(declared) > Config.RABBITMQ_DECLARED_QUEUES_MEMORY:
+            declared.popitem(last=False)
+
+    async def _get_exchange_once(self, channel, exchange_name: str, exchange_type: aio_pika.ExchangeType = aio_pika.ExchangeType.DIRECT):
+        """
+        Declares a durable exchange the first time it is used by this process
+        and afterwards only binds to it locally without a broker round trip.
+        """
+        if exchange_name in MessageQueueService._declared_exchanges:
+            return await channel.get_exchange(exchange_name, ensure=False)
+        exchange = await channel.declare_exchange(exchange_name, exchange_type, durable=True)
+        MessageQueueService._declared_exchanges.add(exchange_name)
+        return exchange
+
+    async def open_channel(self):
+        """
+        Opens a dedicated channel on the shared connection, for long-lived consumers.
+        """
+        connection = await self._get_connection()
+        return await connection.channel()
+
+    async def send_message(self, queue_name: str, message: Union[str, bytes], content_type: str = None, message_type: str = None):
         """
         Publishes a message to the queue asynchronously.
         """
-        connection = None
-        channel = None
-        try:
-            connection = await aio_pika.connect_robust(Config.RABBITMQ_URL)
-            channel = await connection.channel()
+        await self.send_messages(queue_name, [message], content_type=content_type, message_type=message_type)
 
-            await channel.declare_queue(queue_name, durable=True)
+    async def send_messages(self, queue_name: str, messages: List[Union[str, bytes]], content_type: str = None, message_type: str = None):
+        """
+        Publishes several messages to the queue in order and waits for all publisher
+        confirms at once instead of one round trip per message.
+        """
+        if not messages:
+            return
+        async with self._pooled_channel() as channel:
+            await self._declare_queue_once(channel, queue_name)
             exchange = channel.default_exchange
-            await exchange.publish(
-                aio_pika.Message(body=message.encode(), delivery_mode=aio_pika.DeliveryMode.PERSISTENT),
-                routing_key=queue_name,
-            )
-        finally:
-            if connection:
-                await connection.close()
-            if channel:
-                await channel.close()
+            await asyncio.gather(*(
+                exchange.publish(
+                    aio_pika.Message(
+                        body=_as_bytes(message),
+                        content_type=content_type,
+                        type=message_type,
+                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    ),
+                    routing_key=queue_name,
+                )
+                for message in messages
+            ))
+
+    async def publish_to_exchange(self, exchange_name: str, routing_key: str, messages: List[Union[str, bytes]], correlation_id: str = None, content_type: str = None, message_type: str = None,
+                                  exchange_type: aio_pika.ExchangeType = aio_pika.ExchangeType.DIRECT):
+        """
+        Publishes transient messages to an exchange (direct by default) in order, waiting for
+        all publisher confirms at once. Nothing is written to disk by the broker.
+        """
+        if not messages:
+            return
+        async with self._pooled_channel() as channel:
+            exchange = await self._get_exchange_once(channel, exchange_name, exchange_type)
+            await asyncio.gather(*(
+                exchange.publish(
+                    aio_pika.Message(
+                        body=_as_bytes(message),
+                        content_type=content_type,
+                        type=message_type,
+                        delivery_mode=aio_pika.DeliveryMode.NOT_PERSISTENT,
+                        correlation_id=correlation_id,
+                    ),
+                    routing_key=routing_key,
+                )
+                for message in messages
+            ))
 
     async def get_next_message(self, queue_name: str):
         """
-        Consumes messages from the queue asynchronously as an async generator.
+        Consumes messages from the queue asynchronously as an async generator, acking each one
+        once the caller moves on. The consumer gets its own channel on the shared connection.
         """
-        connection = None
+        connection = await self._get_connection()
         channel = None
         try:
-            connection = await aio_pika.connect_robust(Config.RABBITMQ_URL)
             channel = await connection.channel()
+            queue = await channel.declare_queue(queue_name, durable=True)
 
-            await channel.declare_queue(queue_name, durable=True)
-
-            queue = await channel.get_queue(queue_name)
-            
             async with queue.iterator() as queue_iter:
                 async for message in queue_iter:
                     async with message.process():
-                        yield message.body.decode()
+                        yield message
         finally:
-            if connection:
-                await connection.close()
-            if channel:
+            if channel and not channel.is_closed:
                 await channel.close()
 
+    async def consume(self, queue_name: str, prefetch_count: int):
+        """
+        Consumes messages from a durable queue with manual acknowledgement as an async generator.
+        At most prefetch_count messages are delivered to this consumer without being acked;
+        the caller must ack or reject every message it receives.
+
+        When iteration stops, undelivered prefetched messages are returned to the queue, but the
+        channel stays open so messages already handed out can still be acked. It is closed
+        together with the connection.
+        """
+        connection = await self._get_connection()
+        channel = await connection.channel()
+        await channel.set_qos(prefetch_count=prefetch_count)
+        self.consumer_channels[queue_name] = channel
+        queue = await channel.declare_queue(queue_name, durable=True)
+
+        async with queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                yield message
+
+    async def set_prefetch(self, queue_name: str, prefetch_count: int):
+        """
+        Changes the prefetch count of the running consumer of a queue.
+        """
+        channel = self.consumer_channels.get(queue_name)
+        if channel is not None and not channel.is_closed:
+            await channel.set_qos(prefetch_count=prefetch_count)
+
     async def get_queue_length(self, queue_name: str) -> int:
         """
         Returns the number of messages currently in the specified RabbitMQ queue.
         """
-        connection = None
-        channel = None
-        try:
-            connection = await aio_pika.connect_robust(Config.RABBITMQ_URL)
-            channel = await connection.channel()
-
+        async with self._pooled_channel() as channel:
             queue = await channel.declare_queue(queue_name, durable=True)
+            self._remember_queue(queue_name)
             return queue.declaration_result.message_count
 
-        finally:
-            if connection:
-                await connection.close()
-            if channel:
-                await channel.close()
-
     async def delete_queue(self, queue_name: str):
         """
         Deletes a queue after processing is complete.
         """
-        connection = None
-        channel = None
-        try:
-            connection = await aio_pika.connect_robust(Config.RABBITMQ_URL)
-            channel = await connection.channel()
-            await channel.queue_delete(queue_name)  # ✅ Manually delete queue
+        async with self._pooled_channel() as channel:
+            await channel.queue_delete(queue_name)
+            MessageQueueService._declared_queues.pop(queue_name, None)
             print(f"✅ Queue {queue_name} deleted")
-        finally:
-            if connection:
-                await connection.close()
-            if channel:
+
+    async def health_check(self) -> bool:
+        """
+        Verifies a pooled channel is usable, reopening it if the broker closed it.
+        A failure is only logged: the robust connection restores itself, its channels and
+        their consumers after an outage, so nothing is torn down here.
+        """
+        try:
+            async with self._pooled_channel():
+                pass
+            return True
+        except Exception as e:
+            print(f"[MessageQueueService] Health check failed: {e}", flush=True)
+            return False
+
+    async def run_health_checks(self, interval: int = None):
+        """
+        Periodically checks the shared connection so a broken pooled channel is reopened
+        before the next publish needs it.
+        """
+        interval = interval if interval is not None else Config.RABBITMQ_HEALTH_CHECK_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            await self.health_check()
+
+    async def close(self):
+        """
+        Closes the channel pool and the shared connection.
+        """
+        for channel in self.consumer_channels.values():
+            if not channel.is_closed:
                 await channel.close()
+        self.consumer_channels = {}
 
+        cls = MessageQueueService
+        pool, connection = cls._channel_pool, cls._connection
+        cls._channel_pool, cls._connection = None, None
+        cls._declared_queues = OrderedDict()
+        cls._declared_exchanges = set()
+        if pool is not None and not pool.is_closed:
+            await pool.close()
+        if connection is not None and not connection.is_closed:
+            await connection.close()
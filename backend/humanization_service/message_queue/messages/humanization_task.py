@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, Optional
 
 class HumanizationTask(BaseModel):
     """
@@ -11,14 +11,20 @@ class HumanizationTask(BaseModel):
     parameters: Dict[str, int]
     parameter_explanation_versions: Dict[str, str]
     queue_name: str  # Where the result should be sent back
+    reply_to: Optional[str] = None  # Routing key on the results exchange; legacy per-request queue if unset
+    use_result_cache: bool = False  # Replay identical earlier results / join identical running generations
+    accept: Optional[str] = None  # Result content type the API can decode; legacy JSON if unset
 
     @staticmethod
-    def build(request_id: int, original_text: str, model_name: str, parameters: Dict[str, int], parameter_explanation_versions: Dict[str, str], queue_name: str):
+    def build(request_id: int, original_text: str, model_name: str, parameters: Dict[str, int], parameter_explanation_versions: Dict[str, str], queue_name: str, reply_to: Optional[str] = None, use_result_cache: bool = False, accept: Optional[str] = None):
         return HumanizationTask(
             request_id=request_id,
             original_text=original_text,
             model_name=model_name,
             parameters=parameters,
             parameter_explanation_versions=parameter_explanation_versions,
-            queue_name=queue_name
+            queue_name=queue_name,
+            reply_to=reply_to,
+            use_result_cache=use_result_cache,
+            accept=accept
         )
@@ -1,8 +1,29 @@
+import zlib
+
 class HumanizedQueueMessage:
-    def __init__(self, isLast: bool, text_piece: str = "", final_text: str = ""):
+    def __init__(self, isLast: bool, text_piece: str = "", final_text: str = "", length: int = None, checksum: int = None):
         self.isLast = isLast
         self.text_piece = text_piece
         self.final_text = final_text
+        # Set on final messages that do not repeat the streamed text: UTF-8 byte length and CRC-32 of it
+        self.length = length
+        self.checksum = checksum
+
+    @staticmethod
+    def final(final_text: str):
+        """
+        Builds the closing message of a stream, carrying both the text and its length/checksum
+        so each wire format can send whichever it supports.
+        """
+        encoded = final_text.encode()
+        return HumanizedQueueMessage(isLast=True, final_text=final_text, length=len(encoded), checksum=zlib.crc32(encoded))
+
+    def verify(self, text: str) -> bool:
+        """
+        Checks text reassembled from the streamed pieces against the final message's length and checksum.
+        """
+        encoded = text.encode()
+        return len(encoded) == self.length and zlib.crc32(encoded) == self.checksum
 
     def to_dict(self):
         return {
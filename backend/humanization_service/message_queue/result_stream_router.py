@@ -0,0 +1,103 @@
+import aio_pika
+import asyncio
+import uuid
+from core.config import Config
+from message_queue.message_queue_service import MessageQueueService
+
+class ResultStreamOverflowError(Exception):
+    """
+    Raised to a consumer that fell so far behind its results that they were dropped.
+    """
+
+
+class _Subscription(asyncio.Queue):
+    """
+    The bounded buffer of results routed to one request.
+    """
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self.overflowed = False
+
+
+class ResultStreamRouter:
+    """
+    Receives streamed results for every request handled by this API process through a single
+    transient reply queue bound to the results exchange, and routes them to waiting
+    consumers by request id (carried in the AMQP correlation id).
+
+    Deliveries are not acked, so a slow consumer cannot push back on the broker; instead each
+    subscription buffers at most RESULT_SUBSCRIBER_QUEUE_SIZE results and fails once it overflows.
+    """
+
+    def __init__(self, messaging_service: MessageQueueService, exchange_name: str = None):
+        self.messaging_service = messaging_service
+        self.exchange_name = exchange_name or Config.RESULT_EXCHANGE_NAME
+        # A fixed name (rather than a server-generated one) lets the robust channel
+        # redeclare the same queue after a reconnect.
+        self.reply_to = f"humanization_reply_{uuid.uuid4().hex}"
+        self.channel = None
+        self.subscribers = {}
+        self._start_lock = asyncio.Lock()
+
+    async def start(self):
+        """
+        Declares the exchange and this process's exclusive, auto-delete reply queue.
+        """
+        async with self._start_lock:
+            if self.channel is not None and not self.channel.is_closed:
+                return
+            self.channel = await self.messaging_service.open_channel()
+            exchange = await self.channel.declare_exchange(self.exchange_name, aio_pika.ExchangeType.DIRECT, durable=True)
+            queue = await self.channel.declare_queue(self.reply_to, durable=False, exclusive=True, auto_delete=True)
+            await queue.bind(exchange, routing_key=self.reply_to)
+            await queue.consume(self._dispatch, no_ack=True)
+            print(f"[ResultStreamRouter] Listening on reply queue: {self.reply_to}", flush=True)
+
+    async def _dispatch(self, message: aio_pika.abc.AbstractIncomingMessage):
+        """
+        Hands an incoming result message to the subscriber of its request id.
+        """
+        subscriber = self.subscribers.get(message.correlation_id)
+        if subscriber is None:
+            print(f"[ResultStreamRouter] Dropping message for unknown request: {message.correlation_id}", flush=True)
+            return
+        if subscriber.overflowed:
+            return
+        try:
+            subscriber.put_nowait(message)
+        except asyncio.QueueFull:
+            print(f"[ResultStreamRouter] Consumer of request {message.correlation_id} fell behind, dropping its results", flush=True)
+            subscriber.overflowed = True
+
+    def subscribe(self, request_id) -> _Subscription:
+        """
+        Registers interest in the results of a request. Must be called before the task is published.
+        """
+        subscriber = _Subscription(maxsize=Config.RESULT_SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers[str(request_id)] = subscriber
+        return subscriber
+
+    def unsubscribe(self, request_id):
+        """
+        Stops routing results of a request.
+        """
+        self.subscribers.pop(str(request_id), None)
+
+    async def iterate(self, subscriber: _Subscription):
+        """
+        Yields the incoming messages received for a subscription. The caller decides when the stream ends.
+        Raises ResultStreamOverflowError once results were dropped because the caller fell behind.
+        """
+        while True:
+            if subscriber.overflowed:
+                raise ResultStreamOverflowError("Results arrived faster than they were consumed")
+            yield await subscriber.get()
+
+    async def close(self):
+        """
+        Closes the reply channel; the broker then removes the reply queue.
+        """
+        self.subscribers.clear()
+        if self.channel is not None and not self.channel.is_closed:
+            await self.channel.close()
+        self.channel = None
@@ -0,0 +1,76 @@
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator
+
+_END_OF_STREAM = object()
+
+class TokenCoalescer:
+    """
+    Merges a stream of small text pieces into larger ones, flushing when the buffered
+    text reaches a byte threshold or the oldest buffered piece has waited for the time window.
+    A window of 0 disables coalescing, byte threshold included, and passes pieces through unchanged.
+    """
+
+    def __init__(self, max_bytes: int, window_ms: int):
+        self.max_bytes = max_bytes
+        self.window = window_ms / 1000
+
+    async def coalesce(self, pieces: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Yields coalesced text pieces from the given async generator, which is closed along with them.
+        """
+        if self.window <= 0:
+            async with aclosing(pieces):
+                async for piece in pieces:
+                    yield piece
+            return
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for piece in pieces:
+                    queue.put_nowait(piece)
+                queue.put_nowait(_END_OF_STREAM)
+            except Exception as e:
+                queue.put_nowait(e)
+
+        pump_task = asyncio.create_task(pump())
+        buffer = []
+        buffered_bytes = 0
+        deadline = None
+        try:
+            while True:
+                timeout = max(0, deadline - loop.time()) if buffer else None
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield "".join(buffer)
+                    buffer, buffered_bytes = [], 0
+                    continue
+
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                if not buffer:
+                    deadline = loop.time() + self.window
+                buffer.append(item)
+                buffered_bytes += len(item.encode())
+                if buffered_bytes >= self.max_bytes:
+                    yield "".join(buffer)
+                    buffer, buffered_bytes = [], 0
+
+            if buffer:
+                yield "".join(buffer)
+        finally:
+            # The pump must have stopped iterating the source before it can be closed,
+            # or closing it (e.g. when the client disconnects) fails as already running
+            pump_task.cancel()
+            try:
+                await pump_task
+            except asyncio.CancelledError:
+                pass
+            await pieces.aclose()
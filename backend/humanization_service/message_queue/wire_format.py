@@ -0,0 +1,92 @@
+import struct
+from typing import Tuple
+from message_queue.messages.humanization_task import HumanizationTask
+from message_queue.messages.humanized_queue_message import HumanizedQueueMessage
+from core.serialization import dumps, loads
+
+# The AMQP content-type property selects the codec, so nodes of different versions can share
+# queues during a rollout. Messages without a content type are legacy JSON.
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_TASK_V1 = "application/x-humanization-task-v1"
+CONTENT_TYPE_RESULT_FRAME_V1 = "application/x-humanization-result-frame-v1"
+
+# AMQP type property of result messages, so the end of a stream is known without decoding it
+RESULT_TYPE_CHUNK = "chunk"
+RESULT_TYPE_FINAL = "final"
+
+TASK_SCHEMA_VERSION = 1
+RESULT_FRAME_VERSION = 1
+
+# Result frame: version and kind bytes, then the UTF-8 text piece or, for the final frame,
+# the byte length and CRC-32 of the whole text instead of the text itself
+_FRAME_HEADER = struct.Struct("!BB")
+_FINAL_TRAILER = struct.Struct("!II")
+_FRAME_PIECE = 0
+_FRAME_FINAL = 1
+
+# Positional field order of the compact task encoding
+_TASK_FIELDS = (
+    "request_id", "original_text", "model_name", "parameters", "parameter_explanation_versions",
+    "queue_name", "reply_to", "use_result_cache", "accept",
+)
+
+
+class WireFormatError(ValueError):
+    """
+    Raised when a message body cannot be decoded with its content type.
+    """
+
+
+def encode_task(task: HumanizationTask, wire_format: str = "compact") -> Tuple[bytes, str]:
+    """
+    Encodes a task as a compact positional JSON array prefixed with its schema version,
+    or as the legacy JSON object. Returns the body and its content type.
+    """
+    if wire_format == "json":
+        return dumps(task.model_dump()), CONTENT_TYPE_JSON
+    values = [TASK_SCHEMA_VERSION] + [getattr(task, field) for field in _TASK_FIELDS]
+    return dumps(values), CONTENT_TYPE_TASK_V1
+
+
+def decode_task(body: bytes, content_type: str = None) -> HumanizationTask:
+    """
+    Decodes a task published in either format.
+    """
+    if content_type == CONTENT_TYPE_TASK_V1:
+        values = loads(body)
+        if not values or values[0] != TASK_SCHEMA_VERSION:
+            raise WireFormatError(f"Unsupported task schema version: {values[0] if values else None}")
+        return HumanizationTask(**dict(zip(_TASK_FIELDS, values[1:])))
+    if content_type in (None, CONTENT_TYPE_JSON):
+        return HumanizationTask.model_validate_json(body)
+    raise WireFormatError(f"Unsupported task content type: {content_type}")
+
+
+def encode_result(message: HumanizedQueueMessage, content_type: str = None) -> bytes:
+    """
+    Encodes a result message for the content type the requesting API accepts.
+    Legacy JSON repeats the full text in the final message; frames send its length and checksum.
+    """
+    if content_type == CONTENT_TYPE_RESULT_FRAME_V1:
+        if message.isLast:
+            return _FRAME_HEADER.pack(RESULT_FRAME_VERSION, _FRAME_FINAL) + _FINAL_TRAILER.pack(message.length, message.checksum)
+        return _FRAME_HEADER.pack(RESULT_FRAME_VERSION, _FRAME_PIECE) + message.text_piece.encode()
+    return dumps(message.to_dict())
+
+
+def decode_result(body: bytes, content_type: str = None) -> HumanizedQueueMessage:
+    """
+    Decodes a result message published in either format.
+    """
+    if content_type == CONTENT_TYPE_RESULT_FRAME_V1:
+        version, kind = _FRAME_HEADER.unpack_from(body)
+        if version != RESULT_FRAME_VERSION:
+            raise WireFormatError(f"Unsupported result frame version: {version}")
+        if kind == _FRAME_FINAL:
+            length, checksum = _FINAL_TRAILER.unpack_from(body, _FRAME_HEADER.size)
+            return HumanizedQueueMessage(isLast=True, length=length, checksum=checksum)
+        return HumanizedQueueMessage(isLast=False, text_piece=body[_FRAME_HEADER.size:].decode())
+    if content_type in (None, CONTENT_TYPE_JSON):
+        parsed = loads(body)
+        return HumanizedQueueMessage(isLast=parsed["isLast"], text_piece=parsed["text_piece"], final_text=parsed["final_text"])
+    raise WireFormatError(f"Unsupported result content type: {content_type}")
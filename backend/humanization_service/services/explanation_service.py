@@ -1,32 +1,62 @@
 import json
+from typing import Any, Dict
+from database.model.explanation_version import ExplanationVersion
 from database.repository.explanation_version import ExplanationRepository
 from dto.explanation_dto import ExplanationDTO
+from cache.cache_service import CacheService
+from core.config import Config
+
+def explanation_cache_key(version, scale_name: str) -> str:
+    """
+    Cache key of an explanation under its requested version, a number or "LATEST".
+    """
+    return f"explanation_version_{version}_{scale_name}"
+
+def explanation_generation_key(scale_name: str) -> str:
+    """
+    Redis counter bumped whenever the cached explanations of a scale are invalidated.
+    """
+    return f"explanation_generation_{scale_name}"
 
 class ExplanationService:
     """
     Handles operations related to explanation versions.
     """
 
-    def __init__(self, db_service):
+    def __init__(self, db_service, cache_service: CacheService = None):
         self.db_service = db_service
+        self.cache_service = cache_service
         self.explanation_repository = ExplanationRepository(db_service)
 
-    async def create_explanation(self, text: str, version_number: int) -> ExplanationDTO:
+    async def create_explanation(self, version_number: int, scale_name: str, description: str, examples: Dict[str, Any]) -> ExplanationVersion:
         """
-        Creates a new explanation version.
+        Creates a new explanation version, which becomes the latest version of its scale,
+        and invalidates the cached explanations it supersedes.
         """
         explanation = await self.explanation_repository.create_explanation(
             version_number=version_number,
-            scale_name="default_scale",  # Assuming a default scale name for simplicity
-            description=text,
-            examples="default_examples"  # Assuming default examples for simplicity
+            scale_name=scale_name,
+            description=description,
+            examples=json.dumps(examples)  # Stored encoded, as the seeded scales are
+        )
+        if self.cache_service is not None:
+            await self.invalidate_explanation(scale_name, version_number)
+        return explanation
+
+    async def invalidate_explanation(self, scale_name: str, version_number: int):
+        """
+        Drops the shared Redis entries of a scale and tells every process to evict its in-process copies.
+        A re-posted version number replaces the old row, so that key goes too. The scale's generation is
+        bumped first, so a load that read the old row cannot store it back after the delete.
+        """
+        await self.cache_service.bump_generation(explanation_generation_key(scale_name))
+        await self.cache_service.delete(
+            explanation_cache_key("LATEST", scale_name),
+            explanation_cache_key(version_number, scale_name),
         )
-        return ExplanationDTO.build(
-            version_number=explanation.version_number,
-            scale_name=explanation.scale_name,
-            description=explanation.description,
-            examples=explanation.examples,
-            created_at=explanation.created_at
+        await self.cache_service.publish(
+            Config.EXPLANATION_INVALIDATION_CHANNEL,
+            {"scale_name": scale_name, "version_number": version_number},
         )
 
     async def get_explanation(self, scale_name: str, version_number: int = None) -> ExplanationDTO:
@@ -1,5 +1,7 @@
 from database.repository.feedback import FeedbackRepository
 from dto.feedback_dto import FeedbackDTO
+from services.feedback_writer import FeedbackWriter
+from typing import List
 
 class FeedbackService:
     """
@@ -9,15 +11,25 @@ class FeedbackService:
     def __init__(self, db_service):
         self.db_service = db_service
         self.feedback_repository = FeedbackRepository(db_service)
+        self.feedback_writer = FeedbackWriter(self.feedback_repository)
 
-    async def create_feedback(self, humanization_request_id: int, feedback_score: int) -> FeedbackDTO:
+    async def create_feedback(self, humanization_request_id: int, feedback_score: int) -> int:
         """
-        Creates a new feedback entry for a humanization request.
+        Creates a new feedback entry for a humanization request and returns its id.
+        Concurrent submissions are written together by the buffered writer.
         """
-        feedback = await self.feedback_repository.create_feedback(humanization_request_id, feedback_score)
-        return FeedbackDTO(
-            id=feedback.id,
-            humanization_request_id=feedback.humanization_request_id,
-            feedback_score=feedback.feedback_score,
-            created_at=feedback.created_at
-        )
\ No newline at end of file
+        return await self.feedback_writer.submit(humanization_request_id, feedback_score)
+
+    async def create_feedback_batch(self, feedbacks: List[FeedbackDTO]) -> int:
+        """
+        Bulk-loads many feedback entries at once and returns how many were stored.
+        """
+        return await self.feedback_repository.copy_feedback(
+            [(feedback.humanization_request_id, feedback.feedback_score) for feedback in feedbacks]
+        )
+
+    async def close(self):
+        """
+        Flushes buffered feedback.
+        """
+        await self.feedback_writer.close()
@@ -0,0 +1,25 @@
+import asyncio
+from database.repository.feedback import FeedbackRepository
+from core.buffered_writer import BufferedWriter
+from core.config import Config
+
+class FeedbackWriter(BufferedWriter):
+    """
+    Groups single feedback submissions arriving within a short window into one executemany
+    INSERT. submit() returns a future resolved with the new feedback id once committed.
+    """
+
+    def __init__(self, feedback_repository: FeedbackRepository, flush_interval_ms: int = None, max_batch_size: int = None):
+        super().__init__(
+            feedback_repository.create_feedback_many,
+            "feedback entries",
+            flush_interval_ms if flush_interval_ms is not None else Config.FEEDBACK_WRITE_FLUSH_INTERVAL_MS,
+            max_batch_size or Config.FEEDBACK_WRITE_MAX_BATCH_SIZE
+        )
+        self.feedback_repository = feedback_repository
+
+    def submit(self, request_id: int, feedback_score: int) -> asyncio.Future:
+        """
+        Buffers a feedback entry and returns a future resolved with its id.
+        """
+        return self._enqueue((request_id, feedback_score))
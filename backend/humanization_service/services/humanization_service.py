@@ -1,4 +1,3 @@
-import json
 import asyncio
 from database.repository.humanization import HumanizationRepository
 from cache.cache_service import CacheService
@@ -7,6 +6,12 @@ from message_queue.messages.humanization_task import HumanizationTask
 from database.repository.explanation_version import ExplanationRepository
 from typing import Dict
 from dto.explanation_dto import ExplanationDTO
+from services.prompt_template_cache import PromptTemplateCache
+from services.explanation_service import explanation_cache_key, explanation_generation_key
+from core.serialization import loads
+from core.config import Config
+
+PROMPT_INSTRUCTIONS = "Generate the humanized version of the original user input. Your response must contain only the humanized text, no other text or formatting. You cannot change the meaning of the text, only change the style and tone according to the passed parameters. Your task is to only make sure it is more resembling something written by a human, according to the specified parameters."
 
 class HumanizationService:
     """
@@ -21,11 +26,23 @@ class HumanizationService:
         self.messaging_service = messaging_service
         self.humanization_repository = HumanizationRepository(db_service)
         self.explanation_repository = ExplanationRepository(db_service)
+        self.prompt_template_cache = PromptTemplateCache(max_entries=Config.PROMPT_TEMPLATE_CACHE_MAX_ENTRIES)
 
 
     async def build_prompt(self, original_text: str, parameters: dict, explanation_texts: dict) -> str:
         """
         Constructs the system prompt for OpenAI based on parameters and explanations.
+        The parameter block is rendered once per fingerprint and reused from the template cache.
+        """
+        parameter_block = self.prompt_template_cache.get_or_render(
+            parameters, explanation_texts, lambda: self.render_parameter_block(parameters, explanation_texts)
+        )
+        return f"{parameter_block}\nUser input: \"{original_text}\"\n{PROMPT_INSTRUCTIONS}"
+
+
+    def render_parameter_block(self, parameters: dict, explanation_texts: dict) -> str:
+        """
+        Renders the part of the system prompt that only depends on parameters and explanations.
         """
         prompt_lines = [
             "You are transforming text to be more human-like based on the following parameters:",
@@ -35,61 +52,71 @@ class HumanizationService:
             explanation = explanation_texts.get(scale, "No explanation available.")
             prompt_lines.append(f"- {scale.capitalize()}: {value}/10 → {explanation}")
 
-        prompt_lines.append(f"\nUser input: \"{original_text}\"")
-        prompt_lines.append("Generate the humanized version of the original user input. Your response must contain only the humanized text, no other text or formatting. You cannot change the meaning of the text, only change the style and tone according to the passed parameters. Your task is to only make sure it is more resembling something written by a human, according to the specified parameters.")
-
-        return "\n".join(prompt_lines)
+        return "\n".join(prompt_lines) + "\n"
 
 
     async def get_explanation_texts(self, parameters: Dict[str, any], parameter_explanation_versions: Dict[str, str]) -> dict:
         """
         Retrieves explanation texts from cache (Redis) or the database.
+        All scales are resolved together: one cache lookup, at most one query and one cache write.
+        Misses are loaded once fleet-wide and entries are refreshed before they expire.
         """
+        versions = {scale_name: parameter_explanation_versions.get(scale_name, "LATEST") for scale_name in parameters.keys()}
+        cache_keys = {scale_name: explanation_cache_key(version, scale_name) for scale_name, version in versions.items()}
+
+        lookups = {
+            cache_keys[scale_name]: (scale_name, None if version == "LATEST" else int(version))
+            for scale_name, version in versions.items()
+        }
+        # Numbered versions are immutable and LATEST is invalidated on write, so both can live long
+        ttls = {
+            cache_keys[scale_name]: Config.EXPLANATION_LATEST_CACHE_TTL if version == "LATEST" else Config.EXPLANATION_VERSION_CACHE_TTL
+            for scale_name, version in versions.items()
+        }
+
+        async def load_explanations(keys):
+            # Fetch everything that was not cached from the DB at once
+            explanationORMObjs = await self.explanation_repository.get_explanations([lookups[key] for key in keys])
+            loaded = {}
+            for key in keys:
+                explanationORMObj = explanationORMObjs.get(lookups[key])
+                if explanationORMObj:
+                    # Convert ORM object to plain object
+                    loaded[key] = {
+                        "version_number": explanationORMObj.version_number,
+                        "scale_name": explanationORMObj.scale_name,
+                        "description": explanationORMObj.description,
+                        "examples": loads(explanationORMObj.examples),
+                        "created_at": explanationORMObj.created_at.isoformat()
+                    }
+            return loaded
+
+        # Cached under the requested version name (LATEST included); concurrent misses across
+        # tasks and workers collapse into a single query
+        cached_explanations = await self.cache_service.get_many_or_load(
+            list(cache_keys.values()), load_explanations, ttl=ttls, local=True,
+            generations={cache_key: explanation_generation_key(scale_name) for scale_name, cache_key in cache_keys.items()}
+        )
         explanation_texts = {}
+        for scale_name, cache_key in cache_keys.items():
+            cached_explanation = cached_explanations.get(cache_key)
+            if not cached_explanation:
+                raise ValueError(f"Explanation version {versions[scale_name]} not found for scale {scale_name}.")
+            if isinstance(cached_explanation, str):
+                # Written before entries were stored unencoded
+                cached_explanation = loads(cached_explanation)
+            explanation_texts[scale_name] = cached_explanation
+
+        return {scale_name: explanation_texts[scale_name] for scale_name in parameters.keys()}
+
 
-        try:
-            await self.cache_service.connect()
-
-            for scale_name in parameters.keys():
-                version = parameter_explanation_versions.get(scale_name, "LATEST")
-                cache_key = f"explanation_version_{version}_{scale_name}"
-
-                cached_explanation = await self.cache_service.get(cache_key)
-                if cached_explanation:
-                    explanation_texts[scale_name] = json.loads(cached_explanation)
-                    continue
-
-                # Fetch from DB if not cached
-                explanationORMObj = await self.explanation_repository.get_explanation(scale_name, version_number=version if version != "LATEST" else None)
-                if not explanationORMObj:
-                    raise ValueError(f"Explanation version {version} not found for scale {scale_name}.")
-
-                examples = json.loads(explanationORMObj.examples)
-                print("Parsed examples:", examples, flush=True)
-
-                # Convert ORM object to plain object
-                explanation = {
-                    "version_number": explanationORMObj.version_number,
-                    "scale_name": explanationORMObj.scale_name,
-                    "description": explanationORMObj.description,
-                    "examples": examples,
-                    "created_at": explanationORMObj.created_at.isoformat()
-                }
-                print("explanation", explanation, flush=True)
-
-                # Transform into {scale_name: explanation_text}
-                explanation_texts[scale_name] = explanation
-
-                # Cache in Redis (under specific version name, and also under LATEST if no specific varions was provided and LATEST was used)
-                await self.cache_service.set(cache_key, json.dumps(explanation))
-                if version == "LATEST":
-                    latest_cache_key = f"explanation_version_LATEST_{scale_name}"
-                    await self.cache_service.set(latest_cache_key, json.dumps(explanation))
-
-            return explanation_texts
-
-        finally:
-            await self.cache_service.disconnect()
+    async def handle_explanation_invalidation(self, event: dict):
+        """
+        Evicts this process's copies of the explanations replaced by a management write.
+        """
+        self.cache_service.local_cache.delete(explanation_cache_key("LATEST", event["scale_name"]))
+        self.cache_service.local_cache.delete(explanation_cache_key(event["version_number"], event["scale_name"]))
+        print(f"[HumanizationService] Invalidated cached explanations for {event['scale_name']}", flush=True)
 
 
     async def store_humanized_text(self, task: HumanizationTask, humanized_text: str, explanation_versions: Dict[str, int]):
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+class PromptTemplateCache:
+    """
+    Caches the rendered parameter block of the system prompt, keyed by a fingerprint of
+    the scales, their values and the explanation versions used, so that only the user
+    text has to be spliced in per request.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.templates = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(parameters: Dict[str, int], explanation_texts: dict) -> Tuple:
+        """
+        Builds a hashable key identifying the rendered block. Explanations are identified by
+        version number and creation time rather than by their full content.
+        """
+        key = []
+        for scale, value in parameters.items():
+            explanation = explanation_texts.get(scale)
+            if isinstance(explanation, dict):
+                key.append((scale, value, explanation.get("version_number"), explanation.get("created_at")))
+            else:
+                key.append((scale, value, explanation))
+        return tuple(key)
+
+    def get_or_render(self, parameters: Dict[str, int], explanation_texts: dict, render: Callable[[], str]) -> str:
+        """
+        Returns the cached block for these inputs, rendering and storing it on a miss.
+        """
+        key = self.fingerprint(parameters, explanation_texts)
+        template = self.templates.get(key)
+        if template is not None:
+            self.templates.move_to_end(key)
+            self.hits += 1
+            return template
+
+        self.misses += 1
+        template = render()
+        self.templates[key] = template
+        while len(self.templates) > self.max_entries:
+            self.templates.popitem(last=False)
+        return template
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters for monitoring.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.templates),
+        }
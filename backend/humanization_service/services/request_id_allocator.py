@@ -0,0 +1,27 @@
+import asyncio
+from collections import deque
+from database.repository.humanization import HumanizationRepository
+from core.config import Config
+
+class RequestIdAllocator:
+    """
+    Hands out humanization request ids from blocks reserved on the database sequence,
+    so allocating an id is a database round trip only once per block. Ids are unique
+    across API processes; unused ids of a block are simply skipped on restart.
+    """
+
+    def __init__(self, humanization_repository: HumanizationRepository, block_size: int = None):
+        self.humanization_repository = humanization_repository
+        self.block_size = block_size or Config.REQUEST_ID_BLOCK_SIZE
+        self.ids = deque()
+        self._refill_lock = asyncio.Lock()
+
+    async def allocate(self) -> int:
+        """
+        Returns a new request id.
+        """
+        while not self.ids:
+            async with self._refill_lock:
+                if not self.ids:
+                    self.ids.extend(await self.humanization_repository.reserve_ids(self.block_size))
+        return self.ids.popleft()
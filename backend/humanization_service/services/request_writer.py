@@ -0,0 +1,32 @@
+import asyncio
+from database.repository.humanization import HumanizationRepository
+from core.buffered_writer import BufferedWriter
+from core.config import Config
+
+class HumanizationRequestWriter(BufferedWriter):
+    """
+    Inserts humanization request rows off the request path: rows submitted within a short
+    window are written with one executemany INSERT. submit() returns a future resolved once
+    the row is committed, which callers normally do not wait for.
+    """
+
+    def __init__(self, humanization_repository: HumanizationRepository, flush_interval_ms: int = None, max_batch_size: int = None):
+        super().__init__(
+            humanization_repository.create_requests_with_ids,
+            "humanization requests",
+            flush_interval_ms if flush_interval_ms is not None else Config.REQUEST_WRITE_FLUSH_INTERVAL_MS,
+            max_batch_size or Config.REQUEST_WRITE_MAX_BATCH_SIZE
+        )
+        self.humanization_repository = humanization_repository
+
+    def submit(self, request_id: int, original_text: str, parameters: dict, explanation_versions: dict, model_name: str) -> asyncio.Future:
+        """
+        Buffers a request row and returns a future resolved once it is stored.
+        """
+        return self._enqueue({
+            "id": request_id,
+            "original_text": original_text,
+            "parameters": parameters,
+            "explanation_versions": explanation_versions,
+            "model_name": model_name,
+        })
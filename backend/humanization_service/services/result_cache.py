@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import json
+from typing import AsyncIterator, Callable, Dict
+from cache.cache_service import CacheService
+from core.config import Config
+
+class InFlightGeneration:
+    """
+    The text pieces of a generation that is still running, which every identical
+    task follows from the beginning while it progresses.
+    """
+
+    def __init__(self):
+        self.pieces = []
+        self.done = False
+        self.error = None
+        self.followers = 0
+        self.task = None
+        self._updated = asyncio.Event()
+
+    def append(self, piece: str):
+        self.pieces.append(piece)
+        self._notify()
+
+    def finish(self, error: Exception = None):
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def _notify(self):
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """
+        Yields every piece produced so far and then the remaining ones as they arrive.
+        """
+        index = 0
+        while True:
+            while index < len(self.pieces):
+                yield self.pieces[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise RuntimeError(f"Followed generation failed: {self.error}") from self.error
+                return
+            await self._updated.wait()
+
+
+class HumanizationResultCache:
+    """
+    Content-addressed cache of completed humanizations with in-flight deduplication:
+    a repeated task is replayed from Redis, and a task identical to one that is still
+    generating attaches to that generation instead of calling OpenAI again.
+
+    Generations run in their own task, so cancelling the task that started one does not
+    affect the others following it. A generation is only cancelled once nobody follows it.
+    """
+
+    def __init__(self, cache_service: CacheService, ttl: int = None, replay_chunk_size: int = None):
+        self.cache_service = cache_service
+        self.ttl = ttl if ttl is not None else Config.RESULT_CACHE_TTL
+        self.replay_chunk_size = replay_chunk_size or Config.STREAM_COALESCE_MAX_BYTES
+        self.in_flight: Dict[str, InFlightGeneration] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def fingerprint(original_text: str, parameters: Dict[str, int], explanation_versions: Dict[str, int], model_name: str) -> str:
+        """
+        Hashes the canonicalized inputs that determine the generated text.
+        Explanation versions are the resolved version numbers, so LATEST moving on changes the key.
+        """
+        canonical = json.dumps({
+            "original_text": original_text,
+            "parameters": parameters,
+            "explanation_versions": explanation_versions,
+            "model_name": model_name,
+        }, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    async def stream(self, fingerprint: str, generate: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Yields the text pieces for a fingerprint: replayed from the cache, followed from an
+        identical running generation, or produced by generate() and then cached.
+        """
+        cache_key = f"humanization_result_cache_{fingerprint}"
+        cached_text = await self.cache_service.get(cache_key)
+        if cached_text is not None:
+            self.hits += 1
+            for start in range(0, len(cached_text), self.replay_chunk_size):
+                yield cached_text[start:start + self.replay_chunk_size]
+            return
+
+        generation = self.in_flight.get(fingerprint)
+        if generation is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            generation = InFlightGeneration()
+            self.in_flight[fingerprint] = generation
+            generation.task = asyncio.create_task(self._generate(cache_key, fingerprint, generation, generate))
+
+        generation.followers += 1
+        try:
+            async for piece in generation.follow():
+                yield piece
+        finally:
+            generation.followers -= 1
+            if generation.followers == 0 and not generation.done:
+                # Abandoned; identical tasks arriving from now on start afresh
+                self._forget(fingerprint, generation)
+                generation.task.cancel()
+
+    async def _generate(self, cache_key: str, fingerprint: str, generation: InFlightGeneration, generate: Callable[[], AsyncIterator[str]]):
+        """
+        Runs a generation, feeding its followers and caching the complete text.
+        """
+        try:
+            async for piece in generate():
+                generation.append(piece)
+            await self.cache_service.set(cache_key, "".join(generation.pieces), ttl=self.ttl)
+            generation.finish()
+        except asyncio.CancelledError as e:
+            generation.finish(error=e)
+            raise
+        except Exception as e:
+            # Followers re-raise it; the task itself ends quietly
+            generation.finish(error=e)
+        finally:
+            self._forget(fingerprint, generation)
+
+    def _forget(self, fingerprint: str, generation: InFlightGeneration):
+        if self.in_flight.get(fingerprint) is generation:
+            del self.in_flight[fingerprint]
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters for monitoring.
+        """
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "in_flight": len(self.in_flight),
+        }
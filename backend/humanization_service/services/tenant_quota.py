@@ -0,0 +1,62 @@
+import hashlib
+import time
+from typing import Optional
+from cache.cache_service import CacheService
+from core.config import Config
+
+class TenantQuotaExceededError(Exception):
+    """
+    Raised when a tenant has used up its task quota for the current window.
+    """
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"Task quota for the {lane} lane exceeded, retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class TenantQuota:
+    """
+    Per-tenant limits on the number of tasks enqueued on each lane per window, counted in Redis
+    so they hold across API replicas. Tenants are identified by their API key, which is only
+    stored hashed. A limit of 0 disables the quota; Redis errors let tasks through.
+    """
+
+    def __init__(self, cache_service: CacheService, window: int = None):
+        self.cache_service = cache_service
+        self.window = window or Config.TENANT_QUOTA_WINDOW
+        self.limits = {
+            Config.INTERACTIVE_TASK_QUEUE: Config.TENANT_INTERACTIVE_QUOTA,
+            Config.BATCH_TASK_QUEUE: Config.TENANT_BATCH_QUOTA,
+        }
+
+    @staticmethod
+    def tenant_id(api_key: Optional[str]) -> str:
+        if not api_key:
+            return "anonymous"
+        return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+    async def acquire(self, api_key: Optional[str], lane: str, count: int = 1) -> Optional[str]:
+        """
+        Counts count tasks against the tenant's quota on a lane, raising
+        TenantQuotaExceededError without counting them if they do not fit.
+        Returns the counter they were counted in, for release(), or None if the lane has no quota.
+        """
+        limit = self.limits.get(lane, 0)
+        if not limit:
+            return None
+        now = time.time()
+        window_start = int(now // self.window)
+        key = f"tenant_quota_{lane}_{self.tenant_id(api_key)}_{window_start}"
+        used = await self.cache_service.incr(key, count, ttl=self.window)
+        if used is not None and used > limit:
+            await self.cache_service.incr(key, -count)
+            retry_after = max(1, int((window_start + 1) * self.window - now))
+            raise TenantQuotaExceededError(lane, retry_after)
+        return key
+
+    async def release(self, counter: Optional[str], count: int = 1):
+        """
+        Gives back count tasks acquired in a counter that were never enqueued.
+        """
+        if counter is not None:
+            await self.cache_service.incr(counter, -count, ttl=self.window)
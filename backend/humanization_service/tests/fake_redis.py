@@ -0,0 +1,98 @@
+import time
+from cache.cache_service import _RELEASE_LOCK_SCRIPT, _STORE_IF_GENERATION_SCRIPT
+
+class FakeRedis:
+    """
+    The subset of the aioredis client (decode_responses=True) that CacheService uses,
+    kept in memory with key expiry. Shared between CacheService instances, it stands in
+    for the Redis that several processes talk to.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def _live(self, key: str):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    async def get(self, key: str):
+        return self._live(key)
+
+    async def mget(self, keys):
+        return [self._live(key) for key in keys]
+
+    async def set(self, key: str, value, ex: int = None, px: int = None, nx: bool = False):
+        if nx and self._live(key) is not None:
+            return None
+        expires_at = None
+        if ex:
+            expires_at = time.monotonic() + ex
+        elif px:
+            expires_at = time.monotonic() + px / 1000
+        self.data[key] = (str(value), expires_at)
+        return True
+
+    async def delete(self, *keys: str):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    async def exists(self, key: str):
+        return int(self._live(key) is not None)
+
+    async def incrby(self, key: str, amount: int):
+        value = int(self._live(key) or 0) + amount
+        expires_at = self.data[key][1] if key in self.data else None
+        self.data[key] = (str(value), expires_at)
+        return value
+
+    async def incr(self, key: str):
+        return await self.incrby(key, 1)
+
+    async def expire(self, key: str, seconds: int):
+        if self._live(key) is None:
+            return False
+        self.data[key] = (self.data[key][0], time.monotonic() + seconds)
+        return True
+
+    async def eval(self, script: str, numkeys: int, *args):
+        keys, argv = args[:numkeys], [str(arg) for arg in args[numkeys:]]
+        if script == _RELEASE_LOCK_SCRIPT:
+            if self._live(keys[0]) == argv[0]:
+                return await self.delete(keys[0])
+            return 0
+        if script == _STORE_IF_GENERATION_SCRIPT:
+            if (self._live(keys[1]) or "") != argv[2]:
+                return 0
+            await self.set(keys[0], argv[0], ex=int(argv[1]) or None)
+            return 1
+        raise NotImplementedError(script)
+
+    def pipeline(self, transaction: bool = True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.commands = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        commands, self.commands = self.commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
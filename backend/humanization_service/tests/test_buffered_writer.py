@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from core.buffered_writer import BufferedWriter
+from services.feedback_writer import FeedbackWriter
+
+
+class _Store:
+    def __init__(self, fail_batches: int = 0):
+        self.batches = []
+        self.fail_batches = fail_batches
+
+    async def write(self, entries):
+        if self.fail_batches:
+            self.fail_batches -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(entries))
+
+
+def test_full_batch_is_written_without_waiting_for_the_interval():
+    async def scenario():
+        store = _Store()
+        writer = BufferedWriter(store.write, "entries", flush_interval_ms=10_000, max_batch_size=2)
+        await asyncio.wait_for(asyncio.gather(writer._enqueue("a"), writer._enqueue("b")), 1)
+        assert store.batches == [["a", "b"]]
+        await writer.close()
+
+    asyncio.run(scenario())
+
+
+def test_partial_batch_is_written_after_the_interval():
+    async def scenario():
+        store = _Store()
+        writer = BufferedWriter(store.write, "entries", flush_interval_ms=20, max_batch_size=100)
+        stored = writer._enqueue("a")
+        await asyncio.sleep(0)
+        assert store.batches == []
+        await asyncio.wait_for(stored, 1)
+        assert store.batches == [["a"]]
+        await writer.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_batch_fails_only_its_own_entries():
+    async def scenario():
+        store = _Store(fail_batches=1)
+        writer = BufferedWriter(store.write, "entries", flush_interval_ms=10_000, max_batch_size=1)
+        failed = writer._enqueue("a")
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(failed, 1)
+        assert await asyncio.wait_for(writer._enqueue("b"), 1) is None
+        assert store.batches == [["b"]]
+        await writer.close()
+
+    asyncio.run(scenario())
+
+
+def test_close_writes_what_is_still_buffered():
+    async def scenario():
+        store = _Store()
+        writer = BufferedWriter(store.write, "entries", flush_interval_ms=10_000, max_batch_size=100)
+        stored = [writer._enqueue(entry) for entry in "abc"]
+        await writer.close()
+        assert store.batches == [["a", "b", "c"]]
+        assert all(future.done() for future in stored)
+
+    asyncio.run(scenario())
+
+
+def test_feedback_ids_resolve_in_submission_order():
+    class FeedbackRepository:
+        async def create_feedback_many(self, entries):
+            return [100 + score for _, score in entries]
+
+    async def scenario():
+        writer = FeedbackWriter(FeedbackRepository(), flush_interval_ms=10_000, max_batch_size=3)
+        ids = await asyncio.wait_for(asyncio.gather(*(writer.submit(1, score) for score in (2, 0, 1))), 1)
+        assert ids == [102, 100, 101]
+        await writer.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from cache.cache_service import CacheService
+from core.serialization import dumps_str
+from tests.fake_redis import FakeRedis
+
+
+def _cache(redis: FakeRedis = None, lock_timeout_ms: int = 1000) -> CacheService:
+    cache = CacheService()
+    cache.client = redis or FakeRedis()
+    cache.lock_timeout_ms = lock_timeout_ms
+    cache.lock_poll_interval = 0.005
+    cache.xfetch_beta = 0  # Refresh exactly at expiry, never early
+    return cache
+
+
+def _counting_loader(delay: float = 0.02, value=lambda key: f"value of {key}"):
+    calls = []
+
+    async def load(keys):
+        calls.append(list(keys))
+        await asyncio.sleep(delay)
+        return {key: value(key) for key in keys}
+
+    return load, calls
+
+
+def test_concurrent_misses_collapse_to_one_load():
+    async def scenario():
+        cache = _cache()
+        load, calls = _counting_loader()
+        results = await asyncio.gather(*(cache.get_many_or_load(["a"], load) for _ in range(5)))
+        assert results == [{"a": "value of a"}] * 5
+        assert calls == [["a"]]
+
+    asyncio.run(scenario())
+
+
+def test_processes_share_one_load_through_the_redis_lock():
+    async def scenario():
+        redis = FakeRedis()
+        load, calls = _counting_loader()
+        results = await asyncio.gather(*(_cache(redis).get_many_or_load(["a"], load) for _ in range(3)))
+        assert results == [{"a": "value of a"}] * 3
+        assert calls == [["a"]]
+        assert await redis.get("a:lock") is None
+
+    asyncio.run(scenario())
+
+
+def test_waiter_loads_itself_when_the_lock_holder_times_out():
+    async def scenario():
+        redis = FakeRedis()
+        # Another process holds the lock and never stores a value
+        await redis.set("a:lock", "someone-else")
+        cache = _cache(redis, lock_timeout_ms=50)
+        load, calls = _counting_loader(delay=0)
+
+        started = time.monotonic()
+        assert await cache.get_many_or_load(["a"], load) == {"a": "value of a"}
+        assert time.monotonic() - started >= 0.05
+        assert calls == [["a"]]
+
+    asyncio.run(scenario())
+
+
+def test_joiner_loads_itself_when_the_leading_load_is_cancelled():
+    async def scenario():
+        cache = _cache()
+        load, calls = _counting_loader(delay=0.05)
+        leader = asyncio.create_task(cache.get_many_or_load(["a"], load))
+        await asyncio.sleep(0.01)
+        joiner = asyncio.create_task(cache.get_many_or_load(["a"], load))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await joiner == {"a": "value of a"}
+        assert calls == [["a"], ["a"]]
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_during_a_load_keeps_the_old_value_out():
+    async def scenario():
+        cache = _cache()
+        versions = iter(["old", "new"])
+
+        async def load(keys):
+            value = next(versions)
+            if value == "old":
+                # A writer replaces the value while this load is still running
+                await cache.bump_generation("a_generation")
+            return {key: value for key in keys}
+
+        generations = {"a": "a_generation"}
+        assert await cache.get_many_or_load(["a"], load, generations=generations) == {"a": "old"}
+        assert await cache.client.get("a") is None
+        assert await cache.get_many_or_load(["a"], load, generations=generations) == {"a": "new"}
+        assert await cache.get_many_or_load(["a"], load, generations=generations) == {"a": "new"}
+
+    asyncio.run(scenario())
+
+
+def test_expired_value_is_served_while_it_is_refreshed():
+    async def scenario():
+        cache = _cache()
+        await cache.client.set("a", dumps_str({"value": "stale", "delta": 0, "expires_at": time.time() - 1}))
+        load, calls = _counting_loader(value=lambda key: "fresh")
+
+        assert await cache.get_many_or_load(["a"], load) == {"a": "stale"}
+        await asyncio.gather(*cache._refresh_tasks)
+        assert calls == [["a"]]
+        assert await cache.get_many_or_load(["a"], load) == {"a": "fresh"}
+
+    asyncio.run(scenario())
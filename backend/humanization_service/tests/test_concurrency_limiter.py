@@ -0,0 +1,53 @@
+import asyncio
+from worker.concurrency_limiter import ConcurrencyLimiter
+
+
+async def _blocked(task: asyncio.Task) -> bool:
+    await asyncio.sleep(0.01)
+    return not task.done()
+
+
+def test_acquire_waits_at_limit():
+    async def scenario():
+        limiter = ConcurrencyLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        assert await _blocked(waiter)
+        await limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_growing_limit_wakes_waiters():
+    async def scenario():
+        limiter = ConcurrencyLimiter(1)
+        await limiter.acquire()
+        waiters = [asyncio.create_task(limiter.acquire()) for _ in range(2)]
+        assert await _blocked(waiters[0])
+        await limiter.resize(3)
+        await asyncio.wait_for(asyncio.gather(*waiters), 1)
+        assert limiter.in_flight == 3
+
+    asyncio.run(scenario())
+
+
+def test_shrinking_limit_keeps_held_slots():
+    async def scenario():
+        limiter = ConcurrencyLimiter(3)
+        for _ in range(3):
+            await limiter.acquire()
+        await limiter.resize(1)
+        assert limiter.in_flight == 3
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await limiter.release()
+        await limiter.release()
+        # The slot still held already uses the whole new limit
+        assert await _blocked(waiter)
+        await limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
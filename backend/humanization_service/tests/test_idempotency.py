@@ -0,0 +1,91 @@
+import asyncio
+import itertools
+import pytest
+from types import SimpleNamespace
+from api.controller.humanization_controller import HumanizationController, RequestInProgressError
+from cache.cache_service import CacheService
+from dto.humanize_dto import HumanizationRequestDTO
+from tests.fake_redis import FakeRedis
+
+
+def _controller(stored_texts: dict = None) -> HumanizationController:
+    """
+    A controller with only what begin_request and humanize_text touch, on an in-memory Redis.
+    """
+    controller = HumanizationController.__new__(HumanizationController)
+    controller.cache_service = CacheService()
+    controller.cache_service.client = FakeRedis()
+    ids = itertools.count(1)
+
+    async def allocate():
+        return next(ids)
+
+    async def get_request(request_id):
+        return SimpleNamespace(id=request_id, humanized_text=(stored_texts or {}).get(request_id))
+
+    controller.request_ids = SimpleNamespace(allocate=allocate)
+    controller.humanization_repository = SimpleNamespace(get_request=get_request)
+    controller.submitted = []
+    controller.request_writer = SimpleNamespace(submit=lambda **row: controller.submitted.append(row["request_id"]))
+    return controller
+
+
+def _request(idempotency_key: str = "retry-me") -> HumanizationRequestDTO:
+    return HumanizationRequestDTO.build(tag=None, original_text="Some text", parameters={"casualness": 5}, model_name="gpt-4o", idempotency_key=idempotency_key)
+
+
+def test_retry_of_a_finished_request_replays_it():
+    async def scenario():
+        controller = _controller(stored_texts={1: "Humanized"})
+        assert await controller.begin_request(_request(), "key") == (1, None)
+        assert await controller.begin_request(_request(), "key") == (1, "Humanized")
+        assert controller.submitted == [1]
+
+    asyncio.run(scenario())
+
+
+def test_retry_of_a_running_request_is_refused():
+    async def scenario():
+        controller = _controller()
+        await controller.begin_request(_request(), "key")
+        with pytest.raises(RequestInProgressError) as raised:
+            await controller.begin_request(_request(), "key")
+        assert raised.value.request_id == 1
+        assert controller.submitted == [1]
+
+    asyncio.run(scenario())
+
+
+def test_keys_are_scoped_to_the_tenant():
+    async def scenario():
+        controller = _controller()
+        assert await controller.begin_request(_request(), "tenant-a") == (1, None)
+        assert await controller.begin_request(_request(), "tenant-b") == (2, None)
+
+    asyncio.run(scenario())
+
+
+def test_requests_without_a_key_always_run():
+    async def scenario():
+        controller = _controller()
+        assert await controller.begin_request(_request(idempotency_key=None), "key") == (1, None)
+        assert await controller.begin_request(_request(idempotency_key=None), "key") == (2, None)
+
+    asyncio.run(scenario())
+
+
+def test_failed_request_releases_its_key():
+    async def scenario():
+        controller = _controller()
+
+        async def result_chunks(*args, **kwargs):
+            raise RuntimeError("worker failed")
+            yield
+
+        controller.result_chunks = result_chunks
+        with pytest.raises(RuntimeError):
+            await controller.humanize_text(_request(), api_key="key")
+        # The retry runs as a new request instead of waiting on the failed one
+        assert await controller.begin_request(_request(), "key") == (2, None)
+
+    asyncio.run(scenario())
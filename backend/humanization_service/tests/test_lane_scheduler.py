@@ -0,0 +1,81 @@
+import asyncio
+from worker.lane_scheduler import WeightedLaneScheduler
+
+
+def test_backlogged_lanes_share_by_weight():
+    async def scenario():
+        scheduler = WeightedLaneScheduler({"interactive": 3, "batch": 1})
+        for i in range(8):
+            await scheduler.put("interactive", i)
+            await scheduler.put("batch", i)
+
+        lanes = []
+        for _ in range(8):
+            lane, _ = await scheduler.get(limit=1)
+            lanes.append(lane)
+            await scheduler.done(lane)
+        assert lanes.count("interactive") == 6
+        assert lanes.count("batch") == 2
+        # Smooth round-robin interleaves rather than running one lane's share in a burst
+        assert lanes[:4].count("batch") == 1
+
+    asyncio.run(scenario())
+
+
+def test_idle_lane_leaves_its_share():
+    async def scenario():
+        scheduler = WeightedLaneScheduler({"interactive": 3, "batch": 1})
+        for i in range(4):
+            await scheduler.put("batch", i)
+
+        for i in range(4):
+            lane, item = await scheduler.get(limit=1)
+            assert (lane, item) == ("batch", i)
+            await scheduler.done(lane)
+
+    asyncio.run(scenario())
+
+
+def test_capped_lane_leaves_slots_free():
+    async def scenario():
+        scheduler = WeightedLaneScheduler({"interactive": 1, "batch": 1}, max_shares={"batch": 0.5})
+        for i in range(4):
+            await scheduler.put("batch", i)
+
+        for _ in range(2):
+            assert (await scheduler.get(limit=4))[0] == "batch"
+        blocked = asyncio.create_task(scheduler.get(limit=4))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        await scheduler.put("interactive", "urgent")
+        assert await asyncio.wait_for(blocked, 1) == ("interactive", "urgent")
+
+        await scheduler.done("batch")
+        assert (await asyncio.wait_for(scheduler.get(limit=4), 1))[0] == "batch"
+        assert scheduler.stats()["batch"] == {"waiting": 1, "in_flight": 2, "dispatched": 3}
+
+    asyncio.run(scenario())
+
+
+def test_cap_never_drops_below_one_slot():
+    async def scenario():
+        scheduler = WeightedLaneScheduler({"batch": 1}, max_shares={"batch": 0.1})
+        await scheduler.put("batch", "only")
+        assert await asyncio.wait_for(scheduler.get(limit=2), 1) == ("batch", "only")
+
+    asyncio.run(scenario())
+
+
+def test_drain_returns_undispatched_items():
+    async def scenario():
+        scheduler = WeightedLaneScheduler({"interactive": 1, "batch": 1})
+        await scheduler.put("interactive", "a")
+        await scheduler.put("batch", "b")
+        await scheduler.put("batch", "c")
+        await scheduler.get(limit=1)
+
+        assert len(scheduler.drain()) == 2
+        assert all(lane["waiting"] == 0 for lane in scheduler.stats().values())
+
+    asyncio.run(scenario())
@@ -0,0 +1,94 @@
+import asyncio
+from contextlib import aclosing
+from cache.cache_service import CacheService
+from services.result_cache import HumanizationResultCache
+from tests.fake_redis import FakeRedis
+
+
+def _result_cache() -> HumanizationResultCache:
+    cache_service = CacheService()
+    cache_service.client = FakeRedis()
+    return HumanizationResultCache(cache_service, ttl=60, replay_chunk_size=4)
+
+
+def _generator(pieces, calls: list, delay: float = 0.01, error: Exception = None):
+    async def generate():
+        calls.append(1)
+        for piece in pieces:
+            await asyncio.sleep(delay)
+            yield piece
+        if error is not None:
+            raise error
+    return generate
+
+
+async def _collect(result_cache: HumanizationResultCache, generate, fingerprint: str = "f"):
+    return [piece async for piece in result_cache.stream(fingerprint, generate)]
+
+
+def test_identical_tasks_share_one_generation():
+    async def scenario():
+        result_cache = _result_cache()
+        calls = []
+        generate = _generator(["Hello", " world"], calls)
+        results = await asyncio.gather(_collect(result_cache, generate), _collect(result_cache, generate))
+        assert results == [["Hello", " world"]] * 2
+        assert calls == [1]
+        assert result_cache.stats()["coalesced"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_completed_result_is_replayed_from_the_cache():
+    async def scenario():
+        result_cache = _result_cache()
+        calls = []
+        generate = _generator(["Hello", " world"], calls)
+        await _collect(result_cache, generate)
+        assert await _collect(result_cache, generate) == ["Hell", "o wo", "rld"]
+        assert calls == [1]
+        assert result_cache.stats()["hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_one_follower_keeps_the_generation_for_the_others():
+    async def scenario():
+        result_cache = _result_cache()
+        calls = []
+        generate = _generator(["a", "b", "c"], calls)
+        first = asyncio.create_task(_collect(result_cache, generate))
+        second = asyncio.create_task(_collect(result_cache, generate))
+        await asyncio.sleep(0.015)
+        first.cancel()
+        assert await second == ["a", "b", "c"]
+        assert calls == [1]
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_generation_is_cancelled_and_not_cached():
+    async def scenario():
+        result_cache = _result_cache()
+        calls = []
+        async with aclosing(result_cache.stream("f", _generator(["a", "b", "c"], calls))) as pieces:
+            async for piece in pieces:
+                break
+        await asyncio.sleep(0.05)
+        assert result_cache.stats()["in_flight"] == 0
+        assert await result_cache.cache_service.get("humanization_result_cache_f") is None
+
+    asyncio.run(scenario())
+
+
+def test_failed_generation_fails_its_followers_and_is_not_cached():
+    async def scenario():
+        result_cache = _result_cache()
+        calls = []
+        generate = _generator(["a"], calls, error=ValueError("upstream failed"))
+        results = await asyncio.gather(_collect(result_cache, generate), _collect(result_cache, generate), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert calls == [1]
+        assert await result_cache.cache_service.get("humanization_result_cache_f") is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import asyncio
+from contextlib import aclosing
+from message_queue.token_coalescer import TokenCoalescer
+
+
+async def _collect(coalescer: TokenCoalescer, pieces):
+    return [piece async for piece in coalescer.coalesce(pieces)]
+
+
+def test_zero_window_passes_pieces_through():
+    async def pieces():
+        for piece in ["a", "b", "c"]:
+            yield piece
+
+    assert asyncio.run(_collect(TokenCoalescer(max_bytes=1024, window_ms=0), pieces())) == ["a", "b", "c"]
+
+
+def test_flushes_at_byte_threshold():
+    async def pieces():
+        for piece in ["ab", "cd", "ef", "g"]:
+            yield piece
+
+    assert asyncio.run(_collect(TokenCoalescer(max_bytes=4, window_ms=10_000), pieces())) == ["abcd", "efg"]
+
+
+def test_flushes_when_window_elapses():
+    async def pieces():
+        yield "a"
+        yield "b"
+        await asyncio.sleep(0.2)
+        yield "c"
+
+    assert asyncio.run(_collect(TokenCoalescer(max_bytes=1024, window_ms=20), pieces())) == ["ab", "c"]
+
+
+def test_source_error_is_raised():
+    async def pieces():
+        yield "a"
+        raise RuntimeError("model failed")
+
+    async def scenario():
+        received = []
+        try:
+            async for piece in TokenCoalescer(max_bytes=1024, window_ms=10_000).coalesce(pieces()):
+                received.append(piece)
+        except RuntimeError as e:
+            return received, str(e)
+
+    assert asyncio.run(scenario()) == ([], "model failed")
+
+
+def test_closing_early_stops_and_closes_the_source():
+    async def scenario():
+        closed = asyncio.Event()
+
+        async def pieces():
+            try:
+                yield "a"
+                await asyncio.sleep(10)
+                yield "b"
+            finally:
+                closed.set()
+
+        source = pieces()
+
+        async def relay():
+            # Mirrors the API: the source is closed again after the coalesced stream, as on a disconnect
+            async with aclosing(source):
+                async with aclosing(TokenCoalescer(max_bytes=1, window_ms=10_000).coalesce(source)) as coalesced:
+                    async for piece in coalesced:
+                        yield piece
+
+        async with aclosing(relay()) as results:
+            async for piece in results:
+                assert piece == "a"
+                break
+        assert closed.is_set()
+
+    asyncio.run(scenario())
@@ -0,0 +1,63 @@
+import pytest
+from message_queue.messages.humanization_task import HumanizationTask
+from message_queue.messages.humanized_queue_message import HumanizedQueueMessage
+from message_queue.wire_format import (
+    CONTENT_TYPE_JSON, CONTENT_TYPE_RESULT_FRAME_V1, CONTENT_TYPE_TASK_V1, WireFormatError,
+    decode_result, decode_task, encode_result, encode_task
+)
+from core.serialization import dumps
+
+TASK = HumanizationTask.build(
+    request_id=7,
+    original_text="Some text — with ünïcode",
+    model_name="gpt-4o",
+    parameters={"formality": 3, "emotion": 5},
+    parameter_explanation_versions={"formality": "v2"},
+    queue_name="humanization_result_7",
+    reply_to="api-1",
+    use_result_cache=True,
+    accept=CONTENT_TYPE_RESULT_FRAME_V1
+)
+
+
+@pytest.mark.parametrize("wire_format, content_type", [("compact", CONTENT_TYPE_TASK_V1), ("json", CONTENT_TYPE_JSON)])
+def test_task_round_trip(wire_format, content_type):
+    body, encoded_type = encode_task(TASK, wire_format)
+    assert encoded_type == content_type
+    assert decode_task(body, encoded_type) == TASK
+
+
+def test_legacy_task_without_content_type():
+    assert decode_task(TASK.model_dump_json().encode()) == TASK
+
+
+def test_unknown_task_schema_version_is_rejected():
+    with pytest.raises(WireFormatError):
+        decode_task(dumps([99, 7]), CONTENT_TYPE_TASK_V1)
+
+
+@pytest.mark.parametrize("content_type", [None, CONTENT_TYPE_JSON, CONTENT_TYPE_RESULT_FRAME_V1])
+def test_result_piece_round_trip(content_type):
+    message = decode_result(encode_result(HumanizedQueueMessage(isLast=False, text_piece="héllo "), content_type), content_type)
+    assert not message.isLast
+    assert message.text_piece == "héllo "
+
+
+def test_final_frame_carries_length_and_checksum():
+    text = "héllo wörld"
+    message = decode_result(encode_result(HumanizedQueueMessage.final(text), CONTENT_TYPE_RESULT_FRAME_V1), CONTENT_TYPE_RESULT_FRAME_V1)
+    assert message.isLast
+    assert message.final_text == ""
+    assert message.verify(text)
+    assert not message.verify(text[:-1])
+
+
+def test_final_json_repeats_text():
+    message = decode_result(encode_result(HumanizedQueueMessage.final("done")), None)
+    assert message.isLast
+    assert message.final_text == "done"
+
+
+def test_unknown_result_content_type_is_rejected():
+    with pytest.raises(WireFormatError):
+        decode_result(b"", "application/octet-stream")
@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from pydantic import ValidationError
+from openai import AsyncOpenAI
+from services.humanization_service import HumanizationService
+from database.database_service import DatabaseService
+from database.repository.humanization import HumanizationRepository
+from cache.cache_service import CacheService
+from dto.humanize_dto import HumanizationRequestDTO
+from core.serialization import dumps, loads
+from core.config import Config
+
+class HumanizationBatchJob:
+    """
+    Humanizes a JSONL file of HumanizationRequestDTO-shaped records offline, without the API or queue.
+
+    Input is read lazily and at most `window` records are held at once, so memory stays constant
+    regardless of file size. Records run concurrently but their results are emitted in input order,
+    which makes the checkpoint a single position: everything before it is written to the output
+    and stored in humanization_requests. A restarted job resumes from the checkpoint, dropping any
+    output written after it. Records that fail go to a separate errors file next to the output.
+
+    Stored rows are keyed by input line: ids are reserved and recorded in the checkpoint before the
+    rows are inserted, so a crash between the insert and the checkpoint neither duplicates rows nor
+    calls the model again for lines whose results were already stored.
+
+    With openai_batch_format, no model is called: the output holds OpenAI Batch API request lines
+    (custom_id is the record's input line number) ready to be uploaded.
+    """
+
+    def __init__(self, input_path: str, output_path: str, checkpoint_path: str = None, concurrency: int = None,
+                 flush_size: int = None, openai_batch_format: bool = False, store_results: bool = True):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.errors_path = f"{output_path}.errors"
+        self.checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+        self.concurrency = concurrency or Config.BATCH_JOB_CONCURRENCY
+        self.window = self.concurrency * 4  # Records in flight or waiting for earlier ones to finish
+        self.flush_size = flush_size or Config.BATCH_JOB_FLUSH_SIZE
+        self.openai_batch_format = openai_batch_format
+        self.store_results = store_results and not openai_batch_format
+
+        self.db_service = DatabaseService()
+        self.cache_service = CacheService()
+        self.humanization_service = HumanizationService(self.db_service, self.cache_service, messaging_service=None)
+        self.humanization_repository = HumanizationRepository(self.db_service)
+        self.openai_client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
+        self.slots = asyncio.Semaphore(self.concurrency)
+
+    def load_checkpoint(self) -> dict:
+        if not os.path.exists(self.checkpoint_path):
+            return {"line": 0, "input_offset": 0, "output_offset": 0, "errors_offset": 0, "succeeded": 0, "failed": 0, "stored_ids": {}}
+        with open(self.checkpoint_path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        checkpoint.setdefault("errors_offset", 0)
+        checkpoint.setdefault("stored_ids", {})
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint: dict):
+        # Written to a temporary file and renamed, so a crash never leaves a torn checkpoint
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def read_records(self, input_file, line_number: int, offset: int):
+        """
+        Yields (line_number, end_offset, raw_line) for each non-empty input line.
+        """
+        for raw_line in input_file:
+            line_number += 1
+            offset += len(raw_line)
+            if raw_line.strip():
+                yield line_number, offset, raw_line
+
+    async def process_record(self, line_number: int, raw_line: bytes, stored: dict) -> dict:
+        """
+        Turns one input line into its output record. Failures become error records instead of stopping the job.
+        stored maps the line numbers of the interrupted flush to the rows they were already stored as.
+        """
+        try:
+            request = HumanizationRequestDTO.model_validate(loads(raw_line))
+        except (ValueError, ValidationError) as e:
+            return {"error": f"Invalid record: {e}"}
+
+        row = stored.get(line_number)
+        if row is not None and row.humanized_text is not None:
+            # Stored before the crash; reuse it instead of calling the model again
+            return {"tag": request.tag, "humanized_text": row.humanized_text, "id": row.id}
+
+        async with self.slots:
+            try:
+                explanation_texts = await self.humanization_service.get_explanation_texts(
+                    parameters=request.parameters, parameter_explanation_versions=request.parameter_explanation_versions or {}
+                )
+                system_prompt = await self.humanization_service.build_prompt(request.original_text, request.parameters, explanation_texts)
+                messages = [{"role": "system", "content": system_prompt}]
+                if self.openai_batch_format:
+                    return {
+                        "custom_id": f"line-{line_number}",
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {"model": request.model_name, "messages": messages},
+                    }
+
+                response = await self.openai_client.chat.completions.create(model=request.model_name, messages=messages)
+                return {
+                    "tag": request.tag,
+                    "humanized_text": response.choices[0].message.content,
+                    "_row": {
+                        "original_text": request.original_text,
+                        "parameters": request.parameters,
+                        "explanation_versions": {scale: explanation["version_number"] for scale, explanation in explanation_texts.items()},
+                        "model_name": request.model_name,
+                        "humanized_text": response.choices[0].message.content,
+                    },
+                }
+            except Exception as e:
+                return {"tag": request.tag, "error": str(e)}
+
+    async def flush(self, output_file, errors_file, pending: list, checkpoint: dict):
+        """
+        Stores the completed rows in bulk, appends the output and error lines and moves the checkpoint past them.
+        """
+        for line_number, _, record in pending:
+            if "error" in record:
+                record["line"] = line_number
+        records = [record for _, _, record in pending]
+
+        unstored = [(str(line_number), record) for line_number, _, record in pending if "_row" in record]
+        if self.store_results and unstored:
+            # Ids are recorded before the insert; reusing them after a crash keeps it idempotent
+            stored_ids = checkpoint["stored_ids"]
+            fresh_ids = iter(await self.humanization_repository.reserve_ids(
+                sum(1 for line, _ in unstored if line not in stored_ids)
+            ))
+            for line, record in unstored:
+                record["id"] = stored_ids.get(line) or next(fresh_ids)
+            checkpoint["stored_ids"] = {str(line_number): record["id"] for line_number, _, record in pending if "id" in record}
+            self.save_checkpoint(checkpoint)
+            await self.humanization_repository.create_completed_requests_with_ids(
+                [{"id": record["id"], **record["_row"]} for _, record in unstored]
+            )
+        for _, record in unstored:
+            del record["_row"]
+
+        results = [record for record in records if "error" not in record]
+        errors = [record for record in records if "error" in record]
+        for target, lines in ((output_file, results), (errors_file, errors)):
+            target.write(b"".join(dumps(record) + b"\n" for record in lines))
+            target.flush()
+            os.fsync(target.fileno())
+
+        line_number, input_offset, _ = pending[-1]
+        checkpoint["line"] = line_number
+        checkpoint["input_offset"] = input_offset
+        checkpoint["output_offset"] = output_file.tell()
+        checkpoint["errors_offset"] = errors_file.tell()
+        checkpoint["stored_ids"] = {}
+        checkpoint["failed"] += len(errors)
+        checkpoint["succeeded"] += len(results)
+        self.save_checkpoint(checkpoint)
+        pending.clear()
+        print(f"[BatchJob] Checkpoint at line {line_number}: {checkpoint['succeeded']} succeeded, {checkpoint['failed']} failed", flush=True)
+
+    async def run(self):
+        checkpoint = self.load_checkpoint()
+        if checkpoint["line"]:
+            print(f"[BatchJob] Resuming after line {checkpoint['line']}", flush=True)
+
+        # Drop output written after the last checkpoint; those records are processed again
+        for path, offset in ((self.output_path, checkpoint["output_offset"]), (self.errors_path, checkpoint["errors_offset"])):
+            with open(path, "ab") as output_file:
+                output_file.truncate(offset)
+        # Rows the interrupted flush may have stored, by line
+        stored_ids = {int(line): request_id for line, request_id in checkpoint["stored_ids"].items()}
+        rows = await self.humanization_repository.get_requests(list(stored_ids.values())) if stored_ids else []
+        rows_by_id = {row.id: row for row in rows}
+        stored = {line: rows_by_id[request_id] for line, request_id in stored_ids.items() if request_id in rows_by_id}
+
+        in_flight = deque()
+        pending = []
+        try:
+            with open(self.input_path, "rb") as input_file, open(self.output_path, "ab") as output_file, open(self.errors_path, "ab") as errors_file:
+                input_file.seek(checkpoint["input_offset"])
+                records = self.read_records(input_file, checkpoint["line"], checkpoint["input_offset"])
+                exhausted = False
+                while in_flight or not exhausted:
+                    while not exhausted and len(in_flight) < self.window:
+                        entry = next(records, None)
+                        if entry is None:
+                            exhausted = True
+                            break
+                        line_number, offset, raw_line = entry
+                        in_flight.append((line_number, offset, asyncio.create_task(self.process_record(line_number, raw_line, stored))))
+                    if not in_flight:
+                        break
+
+                    # Emit in input order
+                    line_number, offset, task = in_flight.popleft()
+                    pending.append((line_number, offset, await task))
+                    if len(pending) >= self.flush_size:
+                        await self.flush(output_file, errors_file, pending, checkpoint)
+                if pending:
+                    await self.flush(output_file, errors_file, pending, checkpoint)
+        finally:
+            for _, _, task in in_flight:
+                task.cancel()
+            await self.cache_service.disconnect()
+            await self.db_service.close()
+
+        print(f"[BatchJob] Done: {checkpoint['succeeded']} succeeded, {checkpoint['failed']} failed", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Humanize a JSONL file of humanization requests.")
+    parser.add_argument("--input", required=True, help="JSONL file of HumanizationRequestDTO-shaped records")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to; failed records go to <output>.errors")
+    parser.add_argument("--checkpoint", help="Checkpoint file used to resume (default: <output>.checkpoint)")
+    parser.add_argument("--concurrency", type=int, help="Records processed at once")
+    parser.add_argument("--flush-size", type=int, help="Records per output/database flush and checkpoint")
+    parser.add_argument("--openai-batch-format", action="store_true", help="Write OpenAI Batch API request lines instead of calling the model")
+    parser.add_argument("--no-store", action="store_true", help="Do not insert results into humanization_requests")
+    args = parser.parse_args()
+
+    job = HumanizationBatchJob(
+        input_path=args.input,
+        output_path=args.output,
+        checkpoint_path=args.checkpoint,
+        concurrency=args.concurrency,
+        flush_size=args.flush_size,
+        openai_batch_format=args.openai_batch_format,
+        store_results=not args.no_store,
+    )
+    asyncio.run(job.run())
+
+if __name__ == "__main__":
+    main()
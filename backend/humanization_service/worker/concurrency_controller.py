@@ -0,0 +1,94 @@
+import math
+import statistics
+from core.config import Config
+
+class AIMDConcurrencyController:
+    """
+    Picks worker concurrency with additive-increase/multiplicative-decrease driven by
+    upstream LLM signals: rate limiting (429), server errors (5xx), time to first token
+    and per-stream tokens/sec. CPU and memory only act as a safety cap on growth.
+    """
+
+    def __init__(self, min_concurrency: int, max_concurrency: int):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.additive_increase = Config.AIMD_ADDITIVE_INCREASE
+        self.decrease_factor = Config.AIMD_DECREASE_FACTOR
+        self.ttft_target = Config.AIMD_TTFT_TARGET_MS / 1000
+        self.error_rate_threshold = Config.AIMD_ERROR_RATE_THRESHOLD
+        self.tokens_per_second_drop_ratio = Config.AIMD_TOKENS_PER_SECOND_DROP_RATIO
+        self.best_tokens_per_second = None
+        self._reset_window()
+
+    def _reset_window(self):
+        self.ttfts = []
+        self.tokens_per_second = []
+        self.requests = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+
+    def record_success(self, ttft: float, tokens_per_second: float):
+        """
+        Records a completed upstream stream.
+        """
+        self.requests += 1
+        if ttft is not None:
+            self.ttfts.append(ttft)
+        if tokens_per_second is not None:
+            self.tokens_per_second.append(tokens_per_second)
+
+    def record_error(self, status_code: int = None):
+        """
+        Records a failed upstream call; connection errors without a status count as server errors.
+        """
+        self.requests += 1
+        if status_code == 429:
+            self.rate_limited += 1
+        elif status_code is None or status_code >= 500:
+            self.server_errors += 1
+
+    def signals(self) -> dict:
+        """
+        Summarizes the current window.
+        """
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "server_errors": self.server_errors,
+            "ttft_p50": statistics.median(self.ttfts) if self.ttfts else None,
+            "tokens_per_second": statistics.mean(self.tokens_per_second) if self.tokens_per_second else None,
+            "best_tokens_per_second": self.best_tokens_per_second,
+        }
+
+    def _congested(self, signals: dict) -> bool:
+        if signals["rate_limited"] > 0:
+            return True
+        if signals["requests"] and signals["server_errors"] / signals["requests"] > self.error_rate_threshold:
+            return True
+        if signals["ttft_p50"] is not None and signals["ttft_p50"] > self.ttft_target:
+            return True
+        tokens_per_second = signals["tokens_per_second"]
+        if tokens_per_second is not None and self.best_tokens_per_second:
+            return tokens_per_second < self.best_tokens_per_second * self.tokens_per_second_drop_ratio
+        return False
+
+    def next_concurrency(self, current: int, has_backlog: bool, idle: bool, resources_ok: bool) -> int:
+        """
+        Closes the current window and returns the concurrency for the next one.
+        """
+        signals = self.signals()
+        if signals["tokens_per_second"] is not None:
+            # Slowly forget the best observed throughput so the baseline follows upstream changes
+            decayed = (self.best_tokens_per_second or 0) * 0.95
+            self.best_tokens_per_second = max(decayed, signals["tokens_per_second"])
+        self._reset_window()
+
+        if self._congested(signals):
+            target = math.floor(current * self.decrease_factor)
+        elif has_backlog and resources_ok:
+            target = current + self.additive_increase
+        elif idle:
+            target = current - 1
+        else:
+            target = current
+        return max(self.min_concurrency, min(target, self.max_concurrency))
@@ -0,0 +1,37 @@
+import asyncio
+
+class ConcurrencyLimiter:
+    """
+    A semaphore whose limit can be changed in place. Lowering the limit never revokes
+    slots already held; new acquirers wait until in-flight work drops below the new limit.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    async def resize(self, limit: int):
+        """
+        Changes the limit, waking waiters if it grew.
+        """
+        async with self._condition:
+            self.limit = limit
+            self._condition.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
@@ -1,12 +1,24 @@
 import asyncio
-import json
-import psutil  # System resource monitoring
+import os
+from collections import OrderedDict
+import signal
+import socket
 from services.humanization_service import HumanizationService
 from message_queue.message_queue_service import MessageQueueService
 from database.database_service import DatabaseService
 from message_queue.messages.humanization_task import HumanizationTask
 from message_queue.messages.humanized_queue_message import HumanizedQueueMessage
+from message_queue.wire_format import decode_task, encode_result, CONTENT_TYPE_JSON, CONTENT_TYPE_RESULT_FRAME_V1, RESULT_TYPE_CHUNK, RESULT_TYPE_FINAL
+from message_queue.token_coalescer import TokenCoalescer
+from message_queue.control_channel import RequestControlChannel, CONTROL_TYPE_CANCEL
 from cache.cache_service import CacheService
+from worker.concurrency_limiter import ConcurrencyLimiter
+from worker.concurrency_controller import AIMDConcurrencyController
+from worker.resource_sampler import ResourceSampler
+from worker.lane_scheduler import WeightedLaneScheduler
+from worker.result_writer import HumanizationResultWriter
+from services.result_cache import HumanizationResultCache
+import openai
 from openai import AsyncOpenAI
 from core.config import Config
 
@@ -22,99 +34,332 @@ class HumanizationWorker:
         self.humanization_service = HumanizationService(self.db_service, self.cache_service, self.messaging_service)
         self.openai_client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
         self.current_concurrency = Config.MIN_CONCURRENT_TASKS
-        self.semaphore = asyncio.Semaphore(self.current_concurrency)
+        self.limiter = ConcurrencyLimiter(self.current_concurrency)
+        self.concurrency_controller = AIMDConcurrencyController(Config.MIN_CONCURRENT_TASKS, Config.MAX_CONCURRENT_TASKS)
+        self.resource_sampler = ResourceSampler()
+        self.worker_id = f"{socket.gethostname()}_{os.getpid()}"
+        self.result_cache = HumanizationResultCache(self.cache_service)
+        self.result_writer = HumanizationResultWriter(self.humanization_service.humanization_repository)
+        self.token_coalescer = TokenCoalescer(max_bytes=Config.STREAM_COALESCE_MAX_BYTES, window_ms=Config.STREAM_COALESCE_WINDOW_MS)
+        self.lanes = [Config.INTERACTIVE_TASK_QUEUE, Config.BATCH_TASK_QUEUE]
+        self.scheduler = WeightedLaneScheduler(
+            weights={Config.INTERACTIVE_TASK_QUEUE: Config.INTERACTIVE_LANE_WEIGHT, Config.BATCH_TASK_QUEUE: Config.BATCH_LANE_WEIGHT},
+            max_shares={Config.BATCH_TASK_QUEUE: Config.BATCH_LANE_MAX_SHARE}
+        )
+        self.control_channel = RequestControlChannel(self.messaging_service)
+        self.running = {}  # request id -> task processing it
+        self.cancelled_requests = OrderedDict()  # recently cancelled request ids, oldest first
 
-    async def process_task(self, task: HumanizationTask):
-        """Processes a single humanization task."""
-        try:
-            print(f"[Worker] Processing task {task.request_id}", flush=True)
-            explanation_texts = await self.humanization_service.get_explanation_texts(
-                parameters=task.parameters, parameter_explanation_versions=task.parameter_explanation_versions
+    async def publish_result(self, task: HumanizationTask, message: HumanizedQueueMessage):
+        """
+        Sends a result message back to the API, either through the shared results exchange
+        (transient, routed by request id) or the legacy per-request durable queue,
+        encoded in the format the requesting API accepts.
+        """
+        content_type = CONTENT_TYPE_RESULT_FRAME_V1 if task.accept == CONTENT_TYPE_RESULT_FRAME_V1 else CONTENT_TYPE_JSON
+        body = encode_result(message, content_type)
+        message_type = RESULT_TYPE_FINAL if message.isLast else RESULT_TYPE_CHUNK
+        if task.reply_to:
+            await self.messaging_service.publish_to_exchange(
+                exchange_name=Config.RESULT_EXCHANGE_NAME,
+                routing_key=task.reply_to,
+                messages=[body],
+                correlation_id=str(task.request_id),
+                content_type=content_type,
+                message_type=message_type
             )
-
-            system_prompt = await self.humanization_service.build_prompt(
-                task.original_text, task.parameters, explanation_texts
+        else:
+            await self.messaging_service.send_message(
+                queue_name=f"humanization_result_{task.request_id}", message=body, content_type=content_type, message_type=message_type
             )
 
+    async def stream_text(self, response, stream_stats: dict):
+        """Yields the text deltas of an OpenAI streaming response, counting them in stream_stats."""
+        loop = asyncio.get_running_loop()
+        try:
+            async for chunk in response:
+                chunk_text = getattr(chunk.choices[0].delta, "content", None)
+                if chunk_text:
+                    if stream_stats["first_token_at"] is None:
+                        stream_stats["first_token_at"] = loop.time()
+                    stream_stats["tokens"] += 1
+                    yield chunk_text
+        finally:
+            # Drops the upstream connection if the task was cancelled mid-stream
+            await response.close()
+
+    async def generate(self, task: HumanizationTask, explanation_texts: dict):
+        """Streams coalesced text pieces for a task from OpenAI, reporting upstream signals to the concurrency controller."""
+        system_prompt = await self.humanization_service.build_prompt(
+            task.original_text, task.parameters, explanation_texts
+        )
+
+        loop = asyncio.get_running_loop()
+        stream_stats = {"started_at": loop.time(), "first_token_at": None, "tokens": 0}
+        try:
             response = await self.openai_client.chat.completions.create(
                 model=task.model_name,
                 messages=[{"role": "system", "content": system_prompt}],
                 stream=True
             )
 
-            queue_name = f"humanization_result_{task.request_id}"
+            async for text_piece in self.token_coalescer.coalesce(self.stream_text(response, stream_stats)):
+                yield text_piece
+        except openai.APIStatusError as e:
+            self.concurrency_controller.record_error(e.status_code)
+            raise
+        except (openai.APIConnectionError, openai.APITimeoutError):
+            self.concurrency_controller.record_error()
+            raise
+
+        first_token_at = stream_stats["first_token_at"]
+        if first_token_at is None:
+            self.concurrency_controller.record_success(ttft=None, tokens_per_second=None)
+            return
+        streaming_time = loop.time() - first_token_at
+        self.concurrency_controller.record_success(
+            ttft=first_token_at - stream_stats["started_at"],
+            tokens_per_second=stream_stats["tokens"] / streaming_time if streaming_time > 0 else None
+        )
+
+    async def process_task(self, task: HumanizationTask) -> asyncio.Future | None:
+        """Processes a single humanization task. Returns a future resolved once its result is stored."""
+        try:
+            print(f"[Worker] Processing task {task.request_id}", flush=True)
+            explanation_texts = await self.humanization_service.get_explanation_texts(
+                parameters=task.parameters, parameter_explanation_versions=task.parameter_explanation_versions
+            )
+            explanation_versions = {scale: explanation["version_number"] for scale, explanation in explanation_texts.items()}
+
+            if task.use_result_cache:
+                fingerprint = self.result_cache.fingerprint(task.original_text, task.parameters, explanation_versions, task.model_name)
+                text_pieces = self.result_cache.stream(fingerprint, lambda: self.generate(task, explanation_texts))
+            else:
+                text_pieces = self.generate(task, explanation_texts)
+
             collected_chunks = []
-            async for chunk in response:
-                chunk_text = getattr(chunk.choices[0].delta, "content", None)
-                if chunk_text:
-                    collected_chunks.append(chunk_text)
-                    await self.messaging_service.send_message(queue_name=queue_name, message=json.dumps({
-                        "isLast": False,
-                        "text_piece": chunk_text,
-                        "final_text": ""
-                    }))
+            async for text_piece in text_pieces:
+                collected_chunks.append(text_piece)
+                await self.publish_result(task, HumanizedQueueMessage(isLast=False, text_piece=text_piece))
 
             final_text = "".join(collected_chunks)
-            await self.messaging_service.send_message(queue_name=queue_name, message=json.dumps({
-                "isLast": True,
-                "text_piece": "",
-                "final_text": final_text
-            }))
-
-            await self.humanization_service.store_humanized_text(
-                task=task, humanized_text=final_text,
-                explanation_versions={scale: explanation["version_number"] for scale, explanation in explanation_texts.items()}
-            )
+            await self.publish_result(task, HumanizedQueueMessage.final(final_text))
+
+            # Persisted write-behind; the caller acks the task once this resolves
+            stored = asyncio.create_task(self.store_result(task, final_text, explanation_versions))
 
             print(f"[Worker] Task {task.request_id} completed", flush=True)
+            if task.use_result_cache:
+                print(f"[Worker] Result cache: {self.result_cache.stats()}", flush=True)
+            return stored
 
         except Exception as e:
             print(f"❌ Error processing task {task.request_id}: {e}", flush=True)
+            return None
+
+    async def store_result(self, task: HumanizationTask, final_text: str, explanation_versions: dict):
+        """
+        Stores a streamed result through the write-behind writer, retrying failed writes here rather
+        than through redelivery, which would call OpenAI and stream the text again.
+        """
+        delay = Config.RESULT_WRITE_RETRY_DELAY_MS / 1000
+        for attempt in range(1, Config.RESULT_WRITE_MAX_ATTEMPTS + 1):
+            try:
+                await self.result_writer.submit(task=task, humanized_text=final_text, explanation_versions=explanation_versions)
+                return
+            except Exception as e:
+                if attempt == Config.RESULT_WRITE_MAX_ATTEMPTS:
+                    raise
+                print(f"[Worker] Storing the result of task {task.request_id} failed (attempt {attempt}), retrying: {e}", flush=True)
+                await asyncio.sleep(delay)
+                delay *= 2
 
     async def get_queue_size(self):
-        """Simulate checking RabbitMQ queue size (replace with real implementation)."""
-        return await self.messaging_service.get_queue_length("humanization_task")
+        """Returns the number of tasks waiting on all lanes."""
+        lengths = await asyncio.gather(*(self.messaging_service.get_queue_length(lane) for lane in self.lanes))
+        return sum(lengths)
 
     async def adjust_concurrency(self):
-        """Dynamically adjusts concurrency based on system load and queue size."""
+        """
+        Periodically resizes concurrency with the AIMD controller: multiplicative decrease on
+        upstream congestion, additive increase while the backlog is deep, CPU/memory as a safety cap.
+        """
         while True:
-            cpu_usage = psutil.cpu_percent(interval=1)
-            memory_usage = psutil.virtual_memory().percent
+            resources = self.resource_sampler.snapshot()
+            cpu_usage = resources["cpu_percent"]
+            memory_usage = resources["memory_percent"]
             queue_size = await self.get_queue_size()
+            signals = self.concurrency_controller.signals()
 
-            if cpu_usage < 50 and memory_usage < 50 and queue_size > Config.INCREASE_CONCURRENCY_TASK_THRESHOLD:
-                self.current_concurrency = min(self.current_concurrency + 1, Config.MAX_CONCURRENT_TASKS)
-            elif cpu_usage > 80 or memory_usage > 80 or queue_size < Config.DECREASE_CONCURRENCY_TASK_THRESHOLD:
-                self.current_concurrency = max(self.current_concurrency - 1, Config.MIN_CONCURRENT_TASKS)
+            previous_concurrency = self.current_concurrency
+            self.current_concurrency = self.concurrency_controller.next_concurrency(
+                current=self.current_concurrency,
+                has_backlog=queue_size > Config.INCREASE_CONCURRENCY_TASK_THRESHOLD,
+                idle=queue_size < Config.DECREASE_CONCURRENCY_TASK_THRESHOLD and self.limiter.in_flight < self.current_concurrency,
+                resources_ok=cpu_usage < Config.CPU_USAGE_CAP and memory_usage < Config.MEMORY_USAGE_CAP
+            )
 
-            self.semaphore = asyncio.Semaphore(self.current_concurrency)
-            print(f"[Worker] Adjusted concurrency to {self.current_concurrency} (CPU: {cpu_usage}%, Mem: {memory_usage}%, Queue: {queue_size})", flush=True)
+            if self.current_concurrency != previous_concurrency:
+                await self.set_concurrency(self.current_concurrency)
+            print(f"[Worker] Adjusted concurrency to {self.current_concurrency} (CPU: {cpu_usage}%, Mem: {memory_usage}%, Queue: {queue_size}, In flight: {self.limiter.in_flight}, Upstream: {signals})", flush=True)
 
             await asyncio.sleep(Config.ADJUST_CONCURRENCY_INTERVAL)
 
+    def metrics(self) -> dict:
+        """Returns a snapshot of this worker's resource, concurrency and cache metrics."""
+        return {
+            "worker_id": self.worker_id,
+            "resources": self.resource_sampler.snapshot(),
+            "concurrency": {"limit": self.limiter.limit, "in_flight": self.limiter.in_flight},
+            "lanes": self.scheduler.stats(),
+            "database_pool": self.db_service.pool_stats(),
+            "upstream": self.concurrency_controller.signals(),
+            "prompt_template_cache": self.humanization_service.prompt_template_cache.stats(),
+            "result_cache": self.result_cache.stats(),
+        }
+
+    async def publish_metrics(self):
+        """Periodically publishes the metrics snapshot to Redis for the API metrics endpoint."""
+        while True:
+            await self.cache_service.set(f"worker_metrics_{self.worker_id}", self.metrics(), ttl=Config.METRICS_PUBLISH_INTERVAL * 3)
+            await asyncio.sleep(Config.METRICS_PUBLISH_INTERVAL)
+
+    async def set_concurrency(self, concurrency: int):
+        """Resizes the limiter in place and keeps the broker prefetch in sync with it."""
+        await self.limiter.resize(concurrency)
+        for lane in self.lanes:
+            await self.messaging_service.set_prefetch(lane, concurrency)
+
+    async def release_slot(self, lane: str):
+        await self.scheduler.done(lane)
+        await self.limiter.release()
+
+    async def handle_control(self, message: dict):
+        """
+        Handles a control message from the API. A cancelled request that runs here is aborted:
+        its OpenAI stream is closed and its slot freed. The id is remembered either way, so a task
+        cancelled before any worker picked it up is skipped when it arrives.
+        """
+        if message.get("type") != CONTROL_TYPE_CANCEL:
+            return
+        request_id = message["request_id"]
+        self.cancelled_requests[request_id] = True
+        while len(self.cancelled_requests) > Config.CANCELLED_REQUESTS_MEMORY:
+            self.cancelled_requests.popitem(last=False)
+
+        work = self.running.get(request_id)
+        if work is not None:
+            print(f"[Worker] Cancelling task {request_id}", flush=True)
+            work.cancel()
+
+    async def discard_result_queue(self, task: HumanizationTask):
+        """Deletes the legacy result queue of an abandoned task, which nobody reads anymore."""
+        if not task.reply_to:
+            await self.messaging_service.delete_queue(queue_name=f"humanization_result_{task.request_id}")
+
+    async def handle_message(self, lane: str, message):
+        """Processes a delivered task while holding a concurrency slot, then acks it once its result is stored."""
+        try:
+            task = decode_task(message.body, message.content_type)
+        except Exception as e:
+            print(f"❌ Rejecting malformed task message: {e}", flush=True)
+            await self.release_slot(lane)
+            await message.reject(requeue=False)
+            return
+
+        if task.request_id in self.cancelled_requests:
+            print(f"[Worker] Skipping cancelled task {task.request_id}", flush=True)
+            await self.release_slot(lane)
+            await self.discard_result_queue(task)
+            await message.ack()
+            return
+
+        work = asyncio.create_task(self.process_task(task))
+        self.running[task.request_id] = work
+        try:
+            stored = await work
+        except asyncio.CancelledError:
+            if task.request_id not in self.cancelled_requests:
+                raise
+            # Abandoned by the client; nothing is stored and the task is not redelivered
+            print(f"[Worker] Task {task.request_id} cancelled", flush=True)
+            stored = None
+            await self.discard_result_queue(task)
+        finally:
+            self.running.pop(task.request_id, None)
+            await self.release_slot(lane)
+
+        # The slot is already free; the message stays unacked until the result is durable
+        if stored is not None:
+            try:
+                await stored
+            except Exception as e:
+                # The client already has the text; redelivering would only generate it again
+                print(f"❌ Result of task {task.request_id} could not be stored: {e}", flush=True)
+                await message.reject(requeue=False)
+                return
+        await message.ack()
+
     async def run_worker(self):
         """Continuously listens to RabbitMQ and processes tasks dynamically."""
         print("[Worker] Listening for humanization tasks...", flush=True)
 
+        self.resource_sampler.start()
+        self.result_writer.start()
         asyncio.create_task(self.adjust_concurrency())
+        asyncio.create_task(self.publish_metrics())
+        asyncio.create_task(self.messaging_service.run_health_checks())
+        asyncio.create_task(self.cache_service.listen(
+            Config.EXPLANATION_INVALIDATION_CHANNEL, self.humanization_service.handle_explanation_invalidation
+        ))
+        await self.control_channel.listen(self.handle_control)
 
         tasks = set()
+        consumer = asyncio.create_task(self.consume_tasks(tasks))
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signal_number, consumer.cancel)
 
-        async for task_json in self.messaging_service.get_next_message("humanization_task"):
-            task_data = json.loads(task_json)
-            task = HumanizationTask(**task_data)
-
-            async def process_with_semaphore():
-                async with self.semaphore:
-                    await self.process_task(task)
-                    tasks.discard(asyncio.current_task())
-
-            new_task = asyncio.create_task(process_with_semaphore())
-            tasks.add(new_task)
+        try:
+            await consumer
+        except asyncio.CancelledError:
+            print("[Worker] Shutting down, finishing in-flight tasks...", flush=True)
+        finally:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.result_writer.close()
+            await self.control_channel.close()
+            self.resource_sampler.stop()
+            await self.messaging_service.close()
+            await self.cache_service.disconnect()
+            await self.db_service.close()
 
-            tasks = {t for t in tasks if not t.done()}
+    async def receive_lane(self, lane: str):
+        """Hands the task messages delivered on a lane's queue to the scheduler."""
+        # The broker never delivers more unacked tasks per lane than the current limit, so
+        # work left in the queue stays available to other worker replicas.
+        async for message in self.messaging_service.consume(lane, prefetch_count=self.limiter.limit):
+            await self.scheduler.put(lane, message)
 
-        await asyncio.gather(*tasks)
+    async def consume_tasks(self, tasks: set):
+        """
+        Starts processing task messages as concurrency slots free up. Each free slot goes to the
+        lane picked by the weighted scheduler, so batch tasks only take capacity interactive
+        tasks leave unused (up to BATCH_LANE_MAX_SHARE of the slots).
+        """
+        receivers = [asyncio.create_task(self.receive_lane(lane)) for lane in self.lanes]
+        try:
+            while True:
+                await self.limiter.acquire()
+                lane, message = await self.scheduler.get(self.limiter.limit)
+                new_task = asyncio.create_task(self.handle_message(lane, message))
+                tasks.add(new_task)
+                new_task.add_done_callback(tasks.discard)
+        finally:
+            for receiver in receivers:
+                receiver.cancel()
+            # Hand tasks that were delivered but never started back to the broker
+            for message in self.scheduler.drain():
+                await message.reject(requeue=True)
 
 if __name__ == "__main__":
     worker = HumanizationWorker()
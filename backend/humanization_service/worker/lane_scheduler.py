@@ -0,0 +1,74 @@
+import asyncio
+import math
+from collections import deque
+from typing import Any, Dict, Tuple
+
+class WeightedLaneScheduler:
+    """
+    Dispatches task messages delivered on several lanes (queues) with smooth weighted
+    round-robin: while every lane has work, each gets slots in proportion to its weight,
+    and a lane with nothing waiting leaves its share to the others.
+
+    A lane may also be capped to a share of the worker's concurrency limit, which keeps
+    slots free for the other lanes however deep its backlog is.
+    """
+
+    def __init__(self, weights: Dict[str, int], max_shares: Dict[str, float] = None):
+        self.weights = weights
+        self.max_shares = max_shares or {}
+        self.waiting = {lane: deque() for lane in weights}
+        self.in_flight = {lane: 0 for lane in weights}
+        self.credit = {lane: 0 for lane in weights}
+        self.dispatched = {lane: 0 for lane in weights}
+        self._condition = asyncio.Condition()
+
+    def _cap(self, lane: str, limit: int) -> int:
+        share = self.max_shares.get(lane)
+        if share is None:
+            return limit
+        return max(1, math.floor(limit * share))
+
+    def _eligible(self, limit: int):
+        return [lane for lane, items in self.waiting.items() if items and self.in_flight[lane] < self._cap(lane, limit)]
+
+    async def put(self, lane: str, item: Any):
+        async with self._condition:
+            self.waiting[lane].append(item)
+            self._condition.notify_all()
+
+    async def get(self, limit: int) -> Tuple[str, Any]:
+        """
+        Waits for a dispatchable item and returns (lane, item). limit is the worker's current
+        concurrency limit, used for the per-lane caps. Call done(lane) when its work finishes.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._eligible(limit))
+            eligible = self._eligible(limit)
+            total_weight = sum(self.weights[lane] for lane in eligible)
+            for lane in eligible:
+                self.credit[lane] += self.weights[lane]
+            lane = max(eligible, key=lambda lane: self.credit[lane])
+            self.credit[lane] -= total_weight
+            self.in_flight[lane] += 1
+            self.dispatched[lane] += 1
+            return lane, self.waiting[lane].popleft()
+
+    async def done(self, lane: str):
+        async with self._condition:
+            self.in_flight[lane] -= 1
+            self._condition.notify_all()
+
+    def drain(self):
+        """
+        Removes and returns every item not dispatched yet.
+        """
+        items = [item for waiting in self.waiting.values() for item in waiting]
+        for waiting in self.waiting.values():
+            waiting.clear()
+        return items
+
+    def stats(self) -> dict:
+        return {
+            lane: {"waiting": len(self.waiting[lane]), "in_flight": self.in_flight[lane], "dispatched": self.dispatched[lane]}
+            for lane in self.weights
+        }
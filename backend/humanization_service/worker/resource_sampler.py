@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import psutil  # System resource monitoring
+from core.config import Config
+
+class ResourceSampler:
+    """
+    Samples CPU and memory usage on a background thread with non-blocking psutil calls,
+    and event loop lag from inside the loop, publishing exponentially smoothed readings.
+    Nothing here ever blocks the event loop.
+    """
+
+    def __init__(self, interval: float = None, smoothing: float = None):
+        self.interval = interval if interval is not None else Config.RESOURCE_SAMPLE_INTERVAL
+        self.smoothing = smoothing if smoothing is not None else Config.RESOURCE_SAMPLE_SMOOTHING
+        self.cpu_percent = 0.0
+        self.memory_percent = 0.0
+        self.loop_lag = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._loop_lag_task = None
+
+    def _smooth(self, previous: float, sample: float) -> float:
+        return previous + self.smoothing * (sample - previous)
+
+    def start(self):
+        """
+        Starts the sampling thread and the loop lag probe. Must be called from the running loop.
+        """
+        # The first non-blocking call only sets the baseline for the next delta
+        psutil.cpu_percent(interval=None)
+        self.memory_percent = psutil.virtual_memory().percent
+        self._thread = threading.Thread(target=self._sample_system, name="resource-sampler", daemon=True)
+        self._thread.start()
+        self._loop_lag_task = asyncio.create_task(self._sample_loop_lag())
+
+    def _sample_system(self):
+        while not self._stop.wait(self.interval):
+            self.cpu_percent = self._smooth(self.cpu_percent, psutil.cpu_percent(interval=None))
+            self.memory_percent = self._smooth(self.memory_percent, psutil.virtual_memory().percent)
+
+    async def _sample_loop_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started_at = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started_at - self.interval)
+            self.loop_lag = self._smooth(self.loop_lag, lag)
+
+    def snapshot(self) -> dict:
+        """
+        Returns the latest smoothed readings.
+        """
+        return {
+            "cpu_percent": round(self.cpu_percent, 1),
+            "memory_percent": round(self.memory_percent, 1),
+            "loop_lag_ms": round(self.loop_lag * 1000, 2),
+        }
+
+    def stop(self):
+        self._stop.set()
+        if self._loop_lag_task is not None:
+            self._loop_lag_task.cancel()
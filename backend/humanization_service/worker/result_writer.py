@@ -0,0 +1,36 @@
+import asyncio
+from typing import Dict
+from database.repository.humanization import HumanizationRepository
+from message_queue.messages.humanization_task import HumanizationTask
+from core.buffered_writer import BufferedWriter
+from core.config import Config
+
+class HumanizationResultWriter(BufferedWriter):
+    """
+    Write-behind persistence of completed humanizations. Results are buffered and stored
+    with one bulk UPDATE per flush, triggered by size or interval. submit() returns a future
+    that resolves once the result is committed, so the task message is only acked after
+    its result is durable.
+    """
+
+    def __init__(self, humanization_repository: HumanizationRepository, flush_interval_ms: int = None, max_batch_size: int = None):
+        super().__init__(
+            humanization_repository.bulk_update_requests,
+            "humanization results",
+            flush_interval_ms if flush_interval_ms is not None else Config.RESULT_WRITE_FLUSH_INTERVAL_MS,
+            max_batch_size or Config.RESULT_WRITE_MAX_BATCH_SIZE
+        )
+        self.humanization_repository = humanization_repository
+
+    def submit(self, task: HumanizationTask, humanized_text: str, explanation_versions: Dict[str, int]) -> asyncio.Future:
+        """
+        Buffers a completed result and returns a future resolved when it has been stored.
+        """
+        return self._enqueue({
+            "request_id": task.request_id,
+            "original_text": task.original_text,
+            "parameters": task.parameters,
+            "explanation_versions": explanation_versions,
+            "model_name": task.model_name,
+            "humanized_text": humanized_text,
+        })